@@ -1,23 +1,60 @@
+import os
+
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_migrate import Migrate
-import os
-
-myapp_obj = Flask(__name__)
+from app import assets, cli, media, views
+from app.limits import RateLimiter
+from app.live import Broker
+from app.suggest import Typeahead
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
-myapp_obj.config.from_mapping(
-    SECRET_KEY = 'you-will-never-guess',
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'app.db'),
-)
-
-db = SQLAlchemy(myapp_obj)
-migrate = Migrate(myapp_obj, db)
+db = SQLAlchemy()
 
 login_manager = LoginManager()
-login_manager.init_app(myapp_obj)
-login_manager.login_view = 'login'
+login_manager.login_view = 'auth.login'
+
+# Pub/sub for the live event-page stream (set LIVE_BACKEND_URL to share across workers)
+broker = Broker()
+
+# Per-endpoint token buckets and the global write gate (see app/limits.py)
+limiter = RateLimiter()
+
+# In-memory prefix index behind the search box suggestions (see app/suggest.py)
+typeahead = Typeahead()
+
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.from_mapping(
+        SECRET_KEY = 'you-will-never-guess',
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'app.db'),
+    )
+    if config:
+        app.config.from_mapping(config)
+
+    # Template bytecode cache, fingerprinted static URLs and `flask precompile`
+    assets.init_app(app)
+
+    # Avatar uploads, thumbnail worker pool and /media/ (see app/media.py)
+    media.init_app(app)
+
+    db.init_app(app)
+    login_manager.init_app(app)
+    broker.init_app(app)
+    limiter.init_app(app)
+    typeahead.init_app(app)
+
+    # Flask-Migrate pulls in all of Alembic; only the `flask` command needs it
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+    from app import models  # registers the user loader
 
-from app import routes, models
+    # Blueprints; each view module is imported on its first request (see app/views)
+    views.init_app(app)
+    cli.init_app(app)
+    return app
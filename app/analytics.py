@@ -0,0 +1,193 @@
+"""Organizer analytics backed by incremental rollups.
+
+Routes call ``record()`` in the same transaction as the write they count, so
+``activity_rollups`` is always consistent with the raw tables without ever
+scanning them.  Writes land in hourly buckets; ``flask compact-rollups``
+folds hourly buckets older than a cutoff into daily ones with a single
+INSERT ... SELECT ... ON CONFLICT and a DELETE.  Dashboards read only the
+rollup rows for one event (a few hundred at most), whatever the raw volume.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, literal, select, union_all, update
+
+from app import db
+from app.models import ActivityRollup, EventComment, Rating, RollupGranularity, Rsvp, RsvpStatus, dialect_insert
+
+METRICS = ("rsvps_added", "rsvps_removed", "comments", "ratings", "rating_sum")
+KEY = ("event_id", "granularity", "bucket_start")
+
+logger = logging.getLogger(__name__)
+
+
+def utcnow() -> datetime:
+    # Naive UTC, matching the server_default=func.now() timestamps
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _insert():
+    return dialect_insert(ActivityRollup)
+
+
+def _accumulate(stmt, metrics):
+    """ON CONFLICT: add the new counts onto the existing bucket."""
+    columns = ActivityRollup.__table__.c
+    return stmt.on_conflict_do_update(
+        index_elements=KEY,
+        set_={m: columns[m] + stmt.excluded[m] for m in metrics},
+    )
+
+
+def _truncate(column, unit):
+    """Truncates a timestamp to the hour/day, in the format the DateTime column stores."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(unit, column)
+    return func.strftime("%Y-%m-%d 00:00:00.000000" if unit == "day" else "%Y-%m-%d %H:00:00.000000", column)
+
+
+def record(event_id: int, **deltas: int) -> None:
+    """Adds ``deltas`` (e.g. comments=1) to the event's current hourly bucket.
+
+    The hour comes from the database clock, the one that stamps ``created_at``,
+    so ``retract()`` and ``rebuild()`` put a row in the same bucket.
+    Doesn't commit; call it before the commit of the write being counted.
+    """
+    stmt = _insert().values(
+        event_id=event_id,
+        granularity=RollupGranularity.hour,
+        bucket_start=_truncate(func.now(), "hour"),
+        **deltas,
+    )
+    db.session.execute(_accumulate(stmt, deltas))
+
+
+def compact(cutoff: datetime) -> int:
+    """Folds hourly buckets older than ``cutoff`` into daily ones; returns rows folded."""
+    hourly = (ActivityRollup.granularity == RollupGranularity.hour) & (ActivityRollup.bucket_start < cutoff)
+    day = _truncate(ActivityRollup.bucket_start, "day")
+    folded = (
+        select(
+            ActivityRollup.event_id,
+            literal(RollupGranularity.day.name),
+            day,
+            *(func.sum(getattr(ActivityRollup, m)) for m in METRICS),
+        )
+        .where(hourly)
+        .group_by(ActivityRollup.event_id, day)
+    )
+    db.session.execute(_accumulate(_insert().from_select([*KEY, *METRICS], folded), METRICS))
+    removed = db.session.execute(delete(ActivityRollup).where(hourly)).rowcount
+    db.session.commit()
+    return removed
+
+
+def rebuild() -> None:
+    """Recomputes every rollup from the raw tables (one-off backfill).
+
+    Historical RSVP removals aren't recoverable, so only current RSVPs count.
+    """
+    def hourly(model, *metrics, where=None):
+        hour = _truncate(model.created_at, "hour")
+        counts = {m: literal(0) for m in METRICS}
+        counts.update(metrics)
+        query = select(
+            model.event_id.label("event_id"),
+            literal(RollupGranularity.hour.name).label("granularity"),
+            hour.label("bucket_start"),
+            *(counts[m].label(m) for m in METRICS),
+        )
+        if where is not None:
+            query = query.where(where)
+        return query.group_by(model.event_id, hour)
+
+    sources = union_all(
+        hourly(Rsvp, ("rsvps_added", func.count()), where=Rsvp.status == RsvpStatus.going),
+        hourly(EventComment, ("comments", func.count())),
+        hourly(Rating, ("ratings", func.count()), ("rating_sum", func.sum(Rating.score))),
+    ).subquery()
+    key = [sources.c[k] for k in KEY]
+    merged = select(*key, *(func.sum(sources.c[m]) for m in METRICS)).group_by(*key)
+
+    db.session.execute(delete(ActivityRollup))
+    db.session.execute(_insert().from_select([*KEY, *METRICS], merged))
+    db.session.commit()
+
+
+def retract(model, ids) -> set[int]:
+    """Takes deleted comments/ratings back out of the buckets that counted them.
+
+    Call with the ids about to be deleted, in the same transaction.  Each
+    row is subtracted from its hourly bucket, or from the daily bucket that
+    hour was compacted into; a row whose bucket is gone is logged and
+    skipped.  Returns the affected event ids.
+    """
+    if model is Rating:
+        counts = {"ratings": func.count(), "rating_sum": func.sum(Rating.score)}
+    else:
+        counts = {"comments": func.count()}
+    hour = _truncate(model.created_at, "hour")
+    groups = db.session.execute(
+        select(model.event_id, hour, *counts.values())
+        .where(model.id.in_(ids))
+        .group_by(model.event_id, hour)
+    ).all()
+
+    for event_id, bucket, *amounts in groups:
+        if isinstance(bucket, str):  # SQLite returns the truncated timestamp as text
+            bucket = datetime.fromisoformat(bucket)
+        values = {m: getattr(ActivityRollup, m) - n for m, n in zip(counts, amounts)}
+        for granularity, start in (
+            (RollupGranularity.hour, bucket),
+            (RollupGranularity.day, bucket.replace(hour=0)),
+        ):
+            updated = db.session.execute(
+                update(ActivityRollup)
+                .where(
+                    (ActivityRollup.event_id == event_id)
+                    & (ActivityRollup.granularity == granularity)
+                    & (ActivityRollup.bucket_start == start)
+                )
+                .values(values)
+            ).rowcount
+            if updated:
+                break
+        else:
+            logger.warning(
+                "no rollup bucket for event %s at %s; run `flask rebuild-rollups`", event_id, bucket
+            )
+    return {event_id for event_id, *_ in groups}
+
+
+def dashboard(event_id: int, recent_hours: int = 48) -> dict:
+    """Totals, a daily series and the last ``recent_hours`` hourly buckets for one event."""
+    rows = (
+        ActivityRollup.query.filter_by(event_id=event_id)
+        .order_by(ActivityRollup.bucket_start)
+        .all()
+    )
+    since = utcnow() - timedelta(hours=recent_hours)
+    totals = dict.fromkeys(METRICS, 0)
+    daily: dict = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    hourly = []
+    for row in rows:
+        counts = {m: getattr(row, m) for m in METRICS}
+        day = daily[row.bucket_start.date().isoformat()]
+        for m in METRICS:
+            totals[m] += counts[m]
+            day[m] += counts[m]
+        if row.granularity is RollupGranularity.hour and row.bucket_start >= since:
+            hourly.append({"hour": row.bucket_start.isoformat(), **counts})
+
+    totals["rsvps_net"] = totals["rsvps_added"] - totals["rsvps_removed"]
+    totals["average_rating"] = round(totals["rating_sum"] / totals["ratings"], 2) if totals["ratings"] else None
+    return {
+        "event_id": event_id,
+        "totals": totals,
+        "daily": [{"day": day, **counts} for day, counts in sorted(daily.items())],
+        "hourly": hourly,
+    }
+
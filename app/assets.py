@@ -0,0 +1,122 @@
+"""Template bytecode cache and static asset delivery.
+
+* Compiled templates are kept in a ``FileSystemBytecodeCache`` under
+  ``JINJA_CACHE_DIR`` (default ``instance/jinja_cache``) and reused by every
+  worker; ``flask precompile`` fills it ahead of time.
+* ``url_for('static', ...)`` gets a ``?v=<content hash>`` so a URL changes
+  whenever its file does.  Fingerprinted requests are served with a
+  far-future immutable ``Cache-Control``.
+* ``flask precompile`` also writes ``.gz`` (and ``.br``, if the optional
+  ``brotli`` package is installed) next to compressible static files; they
+  are served in place of the original when the client accepts them and
+  they are not older than it.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+import click
+from flask import request, send_from_directory
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+COMPRESSIBLE = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map"}
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+# filename -> (mtime, hash); recomputed only when a file changes
+_hashes: dict[str, tuple[float, str]] = {}
+
+
+def file_hash(static_folder: str, filename: str) -> str | None:
+    path = safe_join(static_folder, filename)
+    try:
+        mtime = os.stat(path).st_mtime
+    except (OSError, TypeError):
+        return None
+    cached = _hashes.get(filename)
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as f:
+            cached = (mtime, hashlib.sha256(f.read()).hexdigest()[:12])
+        _hashes[filename] = cached
+    return cached[1]
+
+
+def is_fresh_variant(static_folder: str, filename: str, suffix: str) -> bool:
+    """Whether ``filename + suffix`` exists and was written after ``filename`` last changed.
+
+    A variant older than its source was compressed from a previous version of
+    it, and serving it under the new fingerprint would pin stale bytes in
+    caches for a year; until ``flask precompile`` runs again the original is sent.
+    """
+    source = safe_join(static_folder, filename)
+    variant = safe_join(static_folder, filename + suffix)
+    try:
+        return os.stat(variant).st_mtime_ns >= os.stat(source).st_mtime_ns
+    except (OSError, TypeError):
+        return False
+
+
+def init_app(app) -> None:
+    cache_dir = app.config.get("JINJA_CACHE_DIR") or os.path.join(app.instance_path, "jinja_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == "static" and "v" not in values:
+            digest = file_hash(app.static_folder, values.get("filename", ""))
+            if digest:
+                values["v"] = digest
+
+    def static(filename):
+        """Like Flask's static view, plus precompressed variants and immutable caching."""
+        accepted = request.accept_encodings
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        response = None
+        for encoding, suffix in ENCODINGS:
+            if accepted[encoding] and is_fresh_variant(app.static_folder, filename, suffix):
+                response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype)
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = send_from_directory(app.static_folder, filename)
+        response.vary.add("Accept-Encoding")
+        if request.args.get("v") and request.args["v"] == file_hash(app.static_folder, filename):
+            response.headers["Cache-Control"] = IMMUTABLE
+        return response
+
+    app.view_functions["static"] = static
+
+    @app.cli.command("precompile")
+    def precompile():
+        """Warm the template bytecode cache and precompress static files."""
+        names = app.jinja_env.list_templates()
+        for name in names:
+            app.jinja_env.get_template(name)
+        click.echo(f"Compiled {len(names)} templates into {cache_dir}")
+
+        written = 0
+        for root, _, files in os.walk(app.static_folder):
+            for name in files:
+                if os.path.splitext(name)[1] not in COMPRESSIBLE:
+                    continue
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    data = f.read()
+                with open(path + ".gz", "wb") as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                written += 1
+                if brotli is not None:
+                    with open(path + ".br", "wb") as f:
+                        f.write(brotli.compress(data))
+                    written += 1
+        click.echo(f"Wrote {written} precompressed static files")
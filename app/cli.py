@@ -0,0 +1,46 @@
+"""``flask`` subcommands.
+
+Each command imports the module that does the work when it runs, so that
+loading the app for one command (or for ``flask db``) doesn't import them all.
+tests/test_imports.py checks that the CLI never loads the views or WTForms, and
+holds each entry point's cold import time to a budget relative to ``import flask``.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+import click
+
+
+@click.command("compact-rollups")
+@click.option("--older-than", default=48, show_default=True, help="Fold hourly buckets older than this many hours.")
+def compact_rollups(older_than):
+    """Fold old hourly activity buckets into daily ones."""
+    from app import analytics
+
+    cutoff = analytics.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=older_than)
+    click.echo(f"Folded {analytics.compact(cutoff)} hourly buckets into daily ones")
+
+
+@click.command("rebuild-rollups")
+def rebuild_rollups():
+    """Recompute all activity rollups from the raw rsvps/comments/ratings tables."""
+    from app import analytics
+    from app.models import ActivityRollup
+
+    analytics.rebuild()
+    click.echo(f"Rebuilt {ActivityRollup.query.count()} rollup buckets")
+
+
+@click.command("audit-queries")
+@click.option("--verbose", is_flag=True, help="Print every plan, not just failures.")
+def audit_queries(verbose):
+    """Fail if any route query full-scans a large table."""
+    from app import query_audit
+
+    query_audit.audit(verbose)
+
+
+def init_app(app) -> None:
+    for command in (compact_rollups, rebuild_rollups, audit_queries):
+        app.cli.add_command(command)
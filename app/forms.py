@@ -1,9 +1,27 @@
 from flask_wtf import FlaskForm
-from wtforms import *
-from wtforms.validators import *
-from datetime import datetime
+from flask_wtf.file import FileAllowed, FileField
+from wtforms import (
+    BooleanField, DateField, DateTimeLocalField, HiddenField, IntegerField, PasswordField,
+    SelectField, StringField, SubmitField, TextAreaField, validators,
+)
+from wtforms.validators import DataRequired, Length, NumberRange, Optional, ValidationError
 from wtforms_sqlalchemy.fields import QuerySelectMultipleField
 from app.models import Category
+from app.recurrence import RecurrenceFreq, parse_exdates
+
+REPEAT_CHOICES = [("", "Does not repeat")] + [(f.value, f.value.capitalize()) for f in RecurrenceFreq]
+
+def coerce_freq(value):
+    # Lets EditEventForm(obj=event) pre-select the stored enum
+    if isinstance(value, RecurrenceFreq):
+        return value.value
+    return value or ""
+
+def validate_exdates(form, field):
+    try:
+        parse_exdates(field.data)
+    except ValueError:
+        raise ValidationError("Skip dates must be YYYY-MM-DD, one per line.")
 
 class EventForm(FlaskForm):
     title = StringField(
@@ -20,6 +38,12 @@ class EventForm(FlaskForm):
     address_line1 = StringField("Address line 1", validators=[DataRequired(), Length(max=255)])
     address_line2 = StringField("Address line 2", validators=[Optional(), Length(max=255)])
 
+    recurrence_freq = SelectField("Repeats", choices=REPEAT_CHOICES, coerce=coerce_freq, default="")
+    recurrence_interval = IntegerField("Every (days/weeks/months)", default=1, validators=[Optional(), NumberRange(min=1)])
+    recurrence_until = DateField("Repeat until", validators=[Optional()])
+    recurrence_count = IntegerField("Number of occurrences", validators=[Optional(), NumberRange(min=1)])
+    recurrence_exdates = TextAreaField("Skip dates (YYYY-MM-DD, one per line)", validators=[Optional(), validate_exdates])
+
     categories = QuerySelectMultipleField(
         "Categories",
         query_factory=lambda: Category.query.order_by(Category.name).all(),
@@ -56,6 +80,7 @@ class RatingForm(FlaskForm):
 
 class EditUserForm(FlaskForm):
     username = StringField('Username', validators=[validators.DataRequired()])
+    avatar = FileField('Profile Picture', validators=[FileAllowed(["jpg", "jpeg", "png", "gif", "webp"], "Images only.")])
     submit =  SubmitField("Apply")
 
 class EditEventForm(FlaskForm):
@@ -73,12 +98,19 @@ class EditEventForm(FlaskForm):
     address_line1 = StringField("Address line 1", validators=[DataRequired(), Length(max=255)])
     address_line2 = StringField("Address line 2", validators=[Optional(), Length(max=255)])
 
+    recurrence_freq = SelectField("Repeats", choices=REPEAT_CHOICES, coerce=coerce_freq, default="")
+    recurrence_interval = IntegerField("Every (days/weeks/months)", default=1, validators=[Optional(), NumberRange(min=1)])
+    recurrence_until = DateField("Repeat until", validators=[Optional()])
+    recurrence_count = IntegerField("Number of occurrences", validators=[Optional(), NumberRange(min=1)])
+    recurrence_exdates = TextAreaField("Skip dates (YYYY-MM-DD, one per line)", validators=[Optional(), validate_exdates])
+
     categories = QuerySelectMultipleField(
         "Categories",
         query_factory=lambda: Category.query.order_by(Category.name).all(),
         get_label="name"
     )
 
+    version = HiddenField(filters=[lambda v: int(v) if v else None])  # optimistic concurrency check
     submit = SubmitField("Apply Changes")
 
     def validate_ends_at(self, field):
@@ -88,3 +120,17 @@ class EditEventForm(FlaskForm):
 class SearchForm(FlaskForm):
     search_query= StringField('Search', validators=[validators.Optional()])
     submit = SubmitField('Search')
+
+class ModerationForm(FlaskForm):
+    action = SelectField("Action", choices=[
+        ("ban", "Ban users"),
+        ("unban", "Unban users"),
+        ("delete_comments", "Delete comments"),
+        ("delete_ratings", "Delete ratings"),
+    ])
+    usernames = TextAreaField("Usernames (one per line)", validators=[Optional()])
+    event_id = IntegerField("Event ID", validators=[Optional()])
+    # Compared with created_at, which the database stamps in UTC
+    since = DateTimeLocalField("From (UTC)", format="%Y-%m-%dT%H:%M", validators=[Optional()])
+    until = DateTimeLocalField("Until (UTC)", format="%Y-%m-%dT%H:%M", validators=[Optional()])
+    submit = SubmitField("Apply")
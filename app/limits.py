@@ -0,0 +1,146 @@
+"""Rate limiting and write admission control.
+
+``RateLimiter.limit(name)`` guards the POST side of a view with two token
+buckets, one keyed by client IP and one by the logged-in user, sized by the
+``RATELIMITS`` config (``{name: (burst, per_seconds)}``).  Views marked
+``write=True`` additionally pass through a global write gate: at most
+``MAX_CONCURRENT_WRITES`` run at once, the rest wait up to
+``WRITE_QUEUE_TIMEOUT`` seconds and are then turned away with 429 instead of
+piling up on SQLite's single writer lock.
+
+Buckets live in process memory unless ``RATELIMIT_BACKEND_URL`` points at
+Redis, in which case every worker shares them.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request
+from flask_login import current_user
+from werkzeug.exceptions import TooManyRequests
+
+DEFAULT_RATELIMITS = {
+    "login": (10, 60),
+    "register": (5, 300),
+    "rsvp": (30, 60),
+    "comment": (10, 60),
+}
+
+
+class MemoryBackend:
+    """Token buckets in a bounded LRU dict (oldest idle keys are evicted first)."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, burst: int, rate: float) -> float:
+        """Takes one token; returns 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisBackend:
+    """Token buckets shared by all workers, updated atomically by a Lua script."""
+
+    SCRIPT = """
+    local burst, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+    local tokens = tonumber(bucket[1]) or burst
+    local stamp = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + (now - stamp) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:  # optional dependency
+            raise RuntimeError("RATELIMIT_BACKEND_URL requires the 'redis' package") from exc
+        self.client = redis.Redis.from_url(url)
+        self._take = self.client.register_script(self.SCRIPT)
+
+    def take(self, key: str, burst: int, rate: float) -> float:
+        return float(self._take(keys=[f"rsvply:ratelimit:{key}"], args=[burst, rate, time.time()]))
+
+
+class WriteGate:
+    """Bounds how many write requests run concurrently in this worker."""
+
+    def __init__(self, slots: int = 4, timeout: float = 2.0):
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(slots)
+
+    def __enter__(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TooManyRequests("The server is busy, please try again.", retry_after=1)
+        return self
+
+    def __exit__(self, *exc):
+        self._slots.release()
+
+
+class RateLimiter:
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.budgets = dict(DEFAULT_RATELIMITS)
+        self.write_gate = WriteGate()
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.enabled = app.config.get("RATELIMIT_ENABLED", True)
+        self.budgets = {**DEFAULT_RATELIMITS, **app.config.get("RATELIMITS", {})}
+        self.write_gate = WriteGate(
+            app.config.get("MAX_CONCURRENT_WRITES", 4),
+            app.config.get("WRITE_QUEUE_TIMEOUT", 2.0),
+        )
+        url = app.config.get("RATELIMIT_BACKEND_URL")
+        self.backend = RedisBackend(url) if url else MemoryBackend()
+
+    def check(self, name: str) -> None:
+        """Raises 429 if the caller's IP or user bucket for ``name`` is empty."""
+        burst, per_seconds = self.budgets[name]
+        rate = burst / per_seconds
+        keys = [f"{name}:ip:{request.remote_addr}"]
+        if current_user.is_authenticated:
+            keys.append(f"{name}:user:{current_user.id}")
+        wait = max(self.backend.take(key, burst, rate) for key in keys)
+        if wait:
+            raise TooManyRequests("Too many requests, slow down.", retry_after=math.ceil(wait))
+
+    def limit(self, name: str, write: bool = False):
+        """Decorator: rate-limits POSTs to the view, optionally behind the write gate."""
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if not self.enabled or request.method != "POST":
+                    return view(*args, **kwargs)
+                self.check(name)
+                if not write:
+                    return view(*args, **kwargs)
+                with self.write_gate:
+                    return view(*args, **kwargs)
+            return wrapped
+        return decorator
@@ -0,0 +1,133 @@
+"""Live event-page updates over Server-Sent Events.
+
+Routes publish small deltas (seat counts, new comments/ratings) after they
+commit.  Each delta is serialized into an SSE frame once and handed to every
+subscriber's bounded queue, so one write fans out to any number of watchers
+without touching the database again.
+
+The backend decides how deltas reach other workers:
+
+* ``LocalBackend`` (default) delivers in-process only.
+* ``RedisBackend`` (``LIVE_BACKEND_URL = "redis://..."``) relays through
+  Redis pub/sub so every worker's subscribers see every delta.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+from typing import Callable, Iterator
+
+CHANNEL_PREFIX = "rsvply:event:"
+
+# Sent to a subscriber whose queue overflowed; the page reloads itself
+RESYNC_FRAME = "event: resync\ndata: {}\n\n"
+HEARTBEAT_FRAME = ": keep-alive\n\n"
+
+logger = logging.getLogger(__name__)
+
+
+def format_frame(kind: str, payload: dict) -> str:
+    return f"event: {kind}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+
+
+class LocalBackend:
+    """Single-process backend: publishing dispatches straight to local subscribers."""
+
+    def __init__(self, dispatch: Callable[[int, str], None]):
+        self.dispatch = dispatch
+
+    def publish(self, event_id: int, frame: str) -> None:
+        self.dispatch(event_id, frame)
+
+
+class RedisBackend:
+    """Cross-worker backend relaying frames through Redis pub/sub."""
+
+    def __init__(self, dispatch: Callable[[int, str], None], url: str):
+        try:
+            import redis
+        except ImportError as exc:  # optional dependency
+            raise RuntimeError("LIVE_BACKEND_URL requires the 'redis' package") from exc
+        self.dispatch = dispatch
+        self.client = redis.Redis.from_url(url)
+        self.pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.psubscribe(CHANNEL_PREFIX + "*")
+        threading.Thread(target=self._listen, name="live-redis", daemon=True).start()
+
+    def publish(self, event_id: int, frame: str) -> None:
+        self.client.publish(f"{CHANNEL_PREFIX}{event_id}", frame)
+
+    def _listen(self) -> None:
+        for message in self.pubsub.listen():
+            channel = message["channel"].decode()
+            self.dispatch(int(channel[len(CHANNEL_PREFIX):]), message["data"].decode())
+
+
+class Broker:
+    """Per-event pub/sub with bounded subscriber queues."""
+
+    def __init__(self, app=None):
+        self._subscribers: dict[int, set[queue.Queue]] = {}
+        self._lock = threading.Lock()
+        self.queue_size = 100
+        self.heartbeat = 15.0
+        self.backend = LocalBackend(self._dispatch)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.queue_size = app.config.get("LIVE_QUEUE_SIZE", self.queue_size)
+        self.heartbeat = app.config.get("LIVE_HEARTBEAT_SECONDS", self.heartbeat)
+        url = app.config.get("LIVE_BACKEND_URL")
+        if url:
+            self.backend = RedisBackend(self._dispatch, url)
+
+    def publish(self, event_id: int, kind: str, payload: dict) -> None:
+        """Fans a delta out; never raises, since the write it reports has already committed."""
+        try:
+            self.backend.publish(event_id, format_frame(kind, payload))
+        except Exception:
+            logger.exception("live update for event %s dropped", event_id)
+
+    def subscribe(self, event_id: int) -> queue.Queue:
+        q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(event_id, set()).add(q)
+        return q
+
+    def unsubscribe(self, event_id: int, q: queue.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(event_id)
+            if subscribers is not None:
+                subscribers.discard(q)
+                if not subscribers:
+                    del self._subscribers[event_id]
+
+    def stream(self, event_id: int) -> Iterator[str]:
+        """Yields SSE frames for one watcher until the client disconnects."""
+        q = self.subscribe(event_id)
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield q.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield HEARTBEAT_FRAME
+        finally:
+            self.unsubscribe(event_id, q)
+
+    def _dispatch(self, event_id: int, frame: str) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(event_id, ()))
+        for q in subscribers:
+            try:
+                q.put_nowait(frame)
+            except queue.Full:
+                # Slow reader: drop its backlog rather than block the writer.
+                # Clear and resync under one lock so a racing put can't refill it.
+                with q.mutex:
+                    q.queue.clear()
+                    q.queue.append(RESYNC_FRAME)
+                    q.not_empty.notify()
@@ -0,0 +1,189 @@
+"""Avatar uploads and their derived thumbnails.
+
+Originals are stored content-addressed as ``<MEDIA_DIR>/originals/<sha256>.<ext>``
+(the extension comes from the decoded image, not the uploaded filename) and
+never change, so everything under ``/media/`` is served with an immutable
+``Cache-Control``.  Thumbnails (JPEG and WebP, one per entry in ``SIZES``) are
+rendered once into ``<MEDIA_DIR>/derived/`` by a small background thread pool,
+not in the upload request; until they exist pages fall back to the original.
+A thumbnail's name carries its edge and a hash of its render settings, so
+changing ``SIZES``, ``FORMATS`` or ``RENDER_VERSION`` gives new URLs;
+``flask regenerate-avatars --missing-only`` then renders them in bulk.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import click
+from flask import abort, send_from_directory, url_for
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# name -> square edge in px (2x the largest size the templates display)
+SIZES = {"sm": 64, "lg": 300}
+FORMATS = {"jpg": ("JPEG", {"quality": 85, "progressive": True}), "webp": ("WEBP", {"quality": 80})}
+
+# Bump when generate() changes how thumbnails are drawn in a way SIZES/FORMATS don't show
+RENDER_VERSION = 1
+
+# Pillow format -> stored extension (which decides the served Content-Type)
+UPLOAD_FORMATS = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "WEBP": "webp"}
+
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+_media_dir = ""
+_executor: ThreadPoolExecutor | None = None
+_ready: set[str] = set()  # derived filenames known to exist
+
+logger = logging.getLogger(__name__)
+
+
+def media_dir() -> str:
+    return _media_dir
+
+
+def original_path(digest: str, ext: str) -> str:
+    return os.path.join(media_dir(), "originals", f"{digest}.{ext}")
+
+
+def render_key(size: str, fmt: str) -> str:
+    """Short hash of everything that decides a thumbnail's bytes."""
+    settings = (RENDER_VERSION, SIZES[size], FORMATS[fmt])
+    return hashlib.sha256(repr(settings).encode()).hexdigest()[:8]
+
+
+def derived_name(digest: str, size: str, fmt: str) -> str:
+    # The edge and render settings are part of the name, so new settings mean new URLs
+    return f"{digest}-{SIZES[size]}px-{render_key(size, fmt)}.{fmt}"
+
+
+def _atomic_write(path: str, write) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def generate(digest: str, ext: str) -> None:
+    """Renders every size/format of one original (runs in the worker pool)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(original_path(digest, ext)) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        for size, edge in SIZES.items():
+            thumb = ImageOps.fit(image, (edge, edge), Image.Resampling.LANCZOS)
+            for fmt, (pil_format, options) in FORMATS.items():
+                name = derived_name(digest, size, fmt)
+                path = os.path.join(media_dir(), "derived", name)
+                _atomic_write(path, lambda f: thumb.save(f, pil_format, **options))
+                _ready.add(name)
+
+
+def save_avatar(upload) -> str:
+    """Stores an uploaded image and queues its thumbnails; returns the avatar URL."""
+    from PIL import Image, UnidentifiedImageError
+
+    data = upload.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError("Images must be 5 MB or smaller.")
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+            image_format = image.format
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise ValueError("That file is not an image we can read.")
+    # The bytes decide the type, not the client's filename
+    if image_format not in UPLOAD_FORMATS:
+        raise ValueError("Upload a JPEG, PNG, GIF or WebP image.")
+    ext = UPLOAD_FORMATS[image_format]
+
+    digest = hashlib.sha256(data).hexdigest()
+    path = original_path(digest, ext)
+    if not os.path.exists(path):
+        _atomic_write(path, lambda f: f.write(data))
+    job = _executor.submit(generate, digest, ext)
+    job.add_done_callback(lambda j: j.exception() and logger.error("thumbnailing %s failed: %s", digest, j.exception()))
+    return url_for("media", filename=f"originals/{digest}.{ext}")
+
+
+def _uploaded_digest(src: str | None) -> str | None:
+    prefix = url_for("media", filename="originals/")
+    if not src or not src.startswith(prefix):
+        return None
+    return src[len(prefix):].split(".", 1)[0]
+
+
+def derived_url(user, size: str, fmt: str) -> str | None:
+    """URL of a user's ``size``/``fmt`` thumbnail, or None until it has been rendered."""
+    digest = _uploaded_digest(user.avatar_url if user is not None else None)
+    if digest is None:
+        return None
+    name = derived_name(digest, size, fmt)
+    if name not in _ready and os.path.exists(os.path.join(media_dir(), "derived", name)):
+        _ready.add(name)
+    if name in _ready:
+        return url_for("media", filename=f"derived/{name}")
+    return None
+
+
+def avatar_url(user, size: str = "sm", fmt: str = "jpg") -> str:
+    """Best URL for a user's avatar at ``size``: thumbnail, then original, then the default."""
+    src = user.avatar_url if user is not None else None
+    if not src:
+        return url_for("static", filename="images/default_pfp.jpg")
+    # An external URL set before uploads existed has no thumbnails
+    return derived_url(user, size, fmt) or src
+
+
+def avatar_webp_url(user, size: str = "sm") -> str | None:
+    """The WebP thumbnail for a ``<source type="image/webp">``, or None if there isn't one yet."""
+    return derived_url(user, size, "webp")
+
+
+def init_app(app) -> None:
+    global _executor, _media_dir
+    _media_dir = app.config.get("MEDIA_DIR") or os.path.join(app.static_folder, "media")
+    for sub in ("originals", "derived"):
+        os.makedirs(os.path.join(media_dir(), sub), exist_ok=True)
+    _executor = ThreadPoolExecutor(
+        max_workers=app.config.get("MEDIA_WORKERS", 2), thread_name_prefix="media"
+    )
+    app.add_template_global(avatar_url)
+    app.add_template_global(avatar_webp_url)
+
+    # Content-addressed: a filename's bytes never change
+    @app.route("/media/<path:filename>")
+    def media(filename):
+        if not filename.startswith(("originals/", "derived/")):
+            abort(404)
+        response = send_from_directory(media_dir(), filename)
+        response.headers["Cache-Control"] = IMMUTABLE
+        return response
+
+    @app.cli.command("regenerate-avatars")
+    @click.option("--missing-only", is_flag=True, help="Skip originals whose thumbnails all exist.")
+    def regenerate_avatars(missing_only):
+        """Re-render thumbnails for every stored avatar."""
+        jobs = []
+        for name in os.listdir(os.path.join(media_dir(), "originals")):
+            digest, ext = name.split(".", 1)
+            if missing_only and all(
+                os.path.exists(os.path.join(media_dir(), "derived", derived_name(digest, size, fmt)))
+                for size in SIZES for fmt in FORMATS
+            ):
+                continue
+            jobs.append(_executor.submit(generate, digest, ext))
+        wait(jobs)
+        failed = [job for job in jobs if job.exception()]
+        for job in failed:
+            click.echo(f"error: {job.exception()}", err=True)
+        click.echo(f"Regenerated thumbnails for {len(jobs) - len(failed)} avatars")
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum as PyEnum
+from typing import Iterator
 from . import login_manager
 from app import db
+from app.recurrence import Occurrence, RecurrenceFreq, expand, occurrence_on
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -47,6 +49,20 @@ class RsvpStatus(PyEnum):
     declined = "declined"
     canceled = "canceled"
 
+class RollupGranularity(PyEnum):
+    hour = "hour"
+    day = "day"
+
+# ---------- Helpers ----------
+def dialect_insert(model):
+    """INSERT supporting ON CONFLICT; only the dialect in use is imported
+    (the PostgreSQL one alone costs ~25 ms)."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
 # ---------- Association Tables ----------
 event_categories = db.Table(
     "event_categories",
@@ -60,6 +76,9 @@ event_categories = db.Table(
 # User(id, email, username, full_name, avatar_url)
 class User(db.Model, UserMixin, TimestampMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("idx_users_is_admin", "is_admin"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
@@ -126,6 +145,16 @@ class Event(db.Model, TimestampMixin):
     is_public: Mapped[bool] = mapped_column(Boolean, server_default=text("true"), nullable=False)
     address_line1: Mapped[str | None] = mapped_column(String(255))
     address_line2: Mapped[str | None] = mapped_column(String(255))
+    version: Mapped[int] = mapped_column(Integer, server_default=text("1"), nullable=False)  # bumped by every edit
+
+    # Recurrence rule (RRULE subset); NULL freq = one-off event
+    recurrence_freq: Mapped[RecurrenceFreq | None] = mapped_column(
+        Enum(RecurrenceFreq, name="recurrence_freq", native_enum=True)
+    )
+    recurrence_interval: Mapped[int] = mapped_column(Integer, server_default=text("1"), nullable=False)
+    recurrence_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    recurrence_count: Mapped[int | None] = mapped_column(Integer)
+    recurrence_exdates: Mapped[str | None] = mapped_column(Text)  # one YYYY-MM-DD per line
 
     organizer_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="RESTRICT"), nullable=False
@@ -145,19 +174,31 @@ class Event(db.Model, TimestampMixin):
     ratings: Mapped[list["Rating"]] = relationship(
         back_populates="event", cascade="all, delete-orphan"
     )
+    occurrences: Mapped[list["EventOccurrence"]] = relationship(
+        back_populates="event", cascade="all, delete-orphan"
+    )
+    # SQLite doesn't enforce ondelete=CASCADE, so the ORM removes these
+    rollups: Mapped[list["ActivityRollup"]] = relationship(
+        back_populates="event", cascade="all, delete-orphan"
+    )
 
     @hybrid_property
     def seats_taken(self) -> int:
         """Counts the number of occupied seats (1 per going RSVP + guests)."""
         return sum(
-            (1 + r.guests_count) for r in self.rsvps if r.status == RsvpStatus.going
+            (1 + r.guests_count) for r in self.rsvps
+            if r.status == RsvpStatus.going and r.occurrence_id is None
         )
 
     @seats_taken.expression  # type: ignore[no-redef]
     def seats_taken(cls):  # noqa: N805
         return (
             select(func.coalesce(func.sum(1 + Rsvp.guests_count), 0))
-            .where((Rsvp.event_id == cls.id) & (Rsvp.status == RsvpStatus.going))
+            .where(
+                (Rsvp.event_id == cls.id)
+                & (Rsvp.status == RsvpStatus.going)
+                & Rsvp.occurrence_id.is_(None)
+            )
             .correlate(cls)
             .scalar_subquery()
         )
@@ -166,21 +207,97 @@ class Event(db.Model, TimestampMixin):
     def is_full(self) -> bool:
         return self.capacity is not None and self.seats_taken >= self.capacity
 
+    @property
+    def is_recurring(self) -> bool:
+        return self.recurrence_freq is not None
+
+    def expand(self, window_start: datetime, window_end: datetime) -> Iterator[Occurrence]:
+        """Lazily yields the occurrences overlapping the given window."""
+        return expand(self, window_start, window_end)
+
+    def occurrence_on(self, day: date) -> Occurrence | None:
+        """Returns the occurrence starting on ``day``, if the rule produces one."""
+        return occurrence_on(self, day)
+
+    def materialize_occurrence(self, occ: Occurrence) -> "EventOccurrence":
+        """Gets or creates the row backing ``occ`` (only needed once someone RSVPs)."""
+        query = EventOccurrence.query.filter_by(event_id=self.id, starts_at=occ.starts_at)
+        row = query.first()
+        if row is None:
+            # Two first RSVPs can race here: the loser's INSERT is a no-op and
+            # it picks up the winner's row instead of hitting the unique key
+            db.session.execute(
+                dialect_insert(EventOccurrence)
+                .values(event_id=self.id, starts_at=occ.starts_at, ends_at=occ.ends_at, capacity=self.capacity)
+                .on_conflict_do_nothing(index_elements=["event_id", "starts_at"])
+            )
+            row = query.one()
+        return row
+
     def __repr__(self) -> str:
         return f"<Event id={self.id} title={self.title!r}>"
 
+# EventOccurrence(id, event_id, starts_at): one materialized instance of a recurring event
+class EventOccurrence(db.Model, TimestampMixin):
+    __tablename__ = "event_occurrences"
+    __table_args__ = (
+        UniqueConstraint("event_id", "starts_at", name="uq_event_occurrences_event_start"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    starts_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ends_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    capacity: Mapped[int | None] = mapped_column(Integer)  # copied from the series when materialized
+
+    event: Mapped[Event] = relationship(back_populates="occurrences")
+    rsvps: Mapped[list["Rsvp"]] = relationship(
+        back_populates="occurrence", cascade="all, delete-orphan"
+    )
+
+    @hybrid_property
+    def seats_taken(self) -> int:
+        return sum(
+            (1 + r.guests_count) for r in self.rsvps if r.status == RsvpStatus.going
+        )
+
+    @seats_taken.expression  # type: ignore[no-redef]
+    def seats_taken(cls):  # noqa: N805
+        return (
+            select(func.coalesce(func.sum(1 + Rsvp.guests_count), 0))
+            .where((Rsvp.occurrence_id == cls.id) & (Rsvp.status == RsvpStatus.going))
+            .correlate(cls)
+            .scalar_subquery()
+        )
+
+    @property
+    def is_full(self) -> bool:
+        return self.capacity is not None and self.seats_taken >= self.capacity
+
+    def __repr__(self) -> str:
+        return f"<EventOccurrence id={self.id} event_id={self.event_id} starts_at={self.starts_at}>"
+
 # Rsvp(id, user_id, event_id)
 class Rsvp(db.Model, TimestampMixin):
     __tablename__ = "rsvps"
     __table_args__ = (
-        UniqueConstraint("user_id", "event_id", name="uq_rsvps_user_event"),
+        # One RSVP per user per one-off event, or per occurrence of a recurring one
+        Index(
+            "uq_rsvps_user_event_occurrence",
+            "user_id", "event_id", text("coalesce(occurrence_id, 0)"),
+            unique=True,
+        ),
         Index("idx_rsvps_event_status", "event_id", "status"),
+        Index("idx_rsvps_occurrence", "occurrence_id"),
         Index("idx_rsvps_user", "user_id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    occurrence_id: Mapped[int | None] = mapped_column(
+        ForeignKey("event_occurrences.id", ondelete="CASCADE")
+    )
 
     # Use native DB enum if available; otherwise it stores values as VARCHAR
     status: Mapped[RsvpStatus] = mapped_column(
@@ -192,6 +309,7 @@ class Rsvp(db.Model, TimestampMixin):
 
     user: Mapped[User] = relationship(back_populates="rsvps")
     event: Mapped[Event] = relationship(back_populates="rsvps")
+    occurrence: Mapped[EventOccurrence | None] = relationship(back_populates="rsvps")
 
     def __repr__(self) -> str:
         return f"<Rsvp id={self.id} user_id={self.user_id} event_id={self.event_id} status={self.status.value}>"
@@ -199,6 +317,11 @@ class Rsvp(db.Model, TimestampMixin):
 # EventComment(id, event_id, user_id, body)
 class EventComment(db.Model):
     __tablename__ = "event_comments"
+    __table_args__ = (
+        Index("idx_event_comments_event", "event_id"),
+        Index("idx_event_comments_user", "user_id"),
+        Index("idx_event_comments_created", "created_at"),  # moderation time windows
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
@@ -220,6 +343,7 @@ class Rating(db.Model):
         CheckConstraint("score >= 1 AND score <= 5", name="chk_rating_score"),
         Index("idx_ratings_event", "event_id"),
         Index("idx_ratings_user", "user_id"),
+        Index("idx_ratings_created", "created_at"),  # moderation time windows
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -234,6 +358,28 @@ class Rating(db.Model):
     def __repr__(self) -> str:
         return f"<Rating id={self.id} event_id={self.event_id} user_id={self.user_id} score={self.score}>"
 
+# ActivityRollup(event_id, granularity, bucket_start): per-event activity counters
+# Written hourly by the routes, folded into daily buckets by `flask compact-rollups`
+class ActivityRollup(db.Model):
+    __tablename__ = "activity_rollups"
+
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    granularity: Mapped[RollupGranularity] = mapped_column(
+        Enum(RollupGranularity, name="rollup_granularity", native_enum=True), primary_key=True
+    )
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+    rsvps_added: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    rsvps_removed: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    comments: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    ratings: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+    rating_sum: Mapped[int] = mapped_column(Integer, server_default=text("0"), nullable=False)
+
+    event: Mapped[Event] = relationship(back_populates="rollups")
+
+    def __repr__(self) -> str:
+        return f"<ActivityRollup event_id={self.event_id} {self.granularity.value} {self.bucket_start}>"
+
 
 @login_manager.user_loader
 def load_user(user_id):
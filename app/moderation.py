@@ -0,0 +1,116 @@
+"""Set-based admin moderation: bulk ban/unban and bulk content removal.
+
+Every operation is a handful of UPDATE/DELETE statements over at most
+``BATCH_SIZE`` rows each, committed per batch so the SQLite writer lock is
+never held for long.  Deleting comments/ratings also takes them back out of
+the analytics rollups and tells live event pages to resync.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import delete, select, true, union, update
+
+from app import analytics, broker, db
+from app.models import EventComment, Rating, User
+
+BATCH_SIZE = 500
+
+
+@dataclass
+class Criteria:
+    """Which users/rows an operation applies to; unset fields don't filter."""
+    usernames: list[str] = field(default_factory=list)
+    event_id: int | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.usernames and self.event_id is None and self.since is None and self.until is None
+
+    def content_filter(self, model):
+        """WHERE clause selecting comments/ratings matching every given field."""
+        clause = true()
+        if self.usernames:
+            clause &= model.user_id.in_(select(User.id).where(User.username.in_(self.usernames)))
+        if self.event_id is not None:
+            clause &= model.event_id == self.event_id
+        if self.since is not None:
+            clause &= model.created_at >= self.since
+        if self.until is not None:
+            clause &= model.created_at < self.until
+        return clause
+
+    def user_ids(self):
+        """Subquery of user ids: the listed usernames, plus (if an event or time
+        window is given) everyone who commented or rated within it."""
+        selects = []
+        if self.usernames:
+            selects.append(select(User.id).where(User.username.in_(self.usernames)))
+        if self.event_id is not None or self.since is not None or self.until is not None:
+            scope = Criteria(event_id=self.event_id, since=self.since, until=self.until)
+            for model in (EventComment, Rating):
+                selects.append(select(model.user_id).where(scope.content_filter(model)))
+        return union(*selects) if len(selects) > 1 else selects[0]
+
+
+def set_banned(criteria: Criteria, banned: bool) -> int:
+    """Bans (or unbans) every matching non-admin user; returns how many changed."""
+    changed = 0
+    targets = (
+        User.id.in_(criteria.user_ids())
+        & ~User.is_admin
+        & (User.is_banned != banned)
+    )
+    while True:
+        batch = select(User.id).where(targets).limit(BATCH_SIZE)
+        count = db.session.execute(
+            update(User).where(User.id.in_(batch)).values(is_banned=banned),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.session.commit()
+        changed += count
+        if count < BATCH_SIZE:
+            return changed
+
+
+def delete_content(model, criteria: Criteria) -> int:
+    """Deletes matching EventComment or Rating rows; returns how many were removed."""
+    removed = 0
+    events = set()
+    while True:
+        ids = db.session.scalars(
+            select(model.id).where(criteria.content_filter(model)).limit(BATCH_SIZE)
+        ).all()
+        if not ids:
+            break
+        events |= analytics.retract(model, ids)
+        db.session.execute(
+            delete(model).where(model.id.in_(ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        removed += len(ids)
+        if len(ids) < BATCH_SIZE:
+            break
+    for event_id in events:
+        broker.publish(event_id, "resync", {})
+    return removed
+
+
+ACTIONS = {
+    "ban": lambda criteria: set_banned(criteria, True),
+    "unban": lambda criteria: set_banned(criteria, False),
+    "delete_comments": lambda criteria: delete_content(EventComment, criteria),
+    "delete_ratings": lambda criteria: delete_content(Rating, criteria),
+}
+
+
+def run(action: str, criteria: Criteria) -> int:
+    if not isinstance(action, str) or action not in ACTIONS:
+        raise ValueError(f"Unknown moderation action {action!r}")
+    if criteria.is_empty:
+        raise ValueError("Give at least one username, event or time bound.")
+    return ACTIONS[action](criteria)
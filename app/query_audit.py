@@ -0,0 +1,225 @@
+"""Query-plan audit: ``flask audit-queries``.
+
+Seeds a scratch database, drives every route through the test client (see
+``scenarios()``: new query paths need a request there) while
+recording the SELECT/UPDATE/DELETEs each one issues, then runs the database's
+EXPLAIN on every recorded statement.  A full scan of one of the large tables
+fails the audit unless the route is listed in ``SCAN_ALLOWED`` (e.g. the
+unfiltered event listing), and so does a route that ``scenarios()`` never
+requests.  tests/test_query_plans.py runs it on every test run.
+
+The audit writes to whatever DATABASE_URL points at, so run it by hand only
+against an empty scratch database::
+
+    DATABASE_URL=sqlite:////tmp/audit.db flask --app app audit-queries
+    DATABASE_URL=postgresql://localhost/rsvply_audit flask --app app audit-queries
+"""
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app, has_request_context, request, request_started
+from sqlalchemy import event as sa_event, insert, inspect, text
+from werkzeug.security import generate_password_hash
+
+from app import analytics, db, limiter
+from app.models import Event, EventComment, Rating, Rsvp, RsvpStatus, User
+from app.recurrence import RecurrenceFreq
+
+LARGE_TABLES = {"users", "events", "rsvps", "event_comments", "ratings", "event_occurrences"}
+
+# Routes whose job is to look at every row; a full scan there is expected
+SCAN_ALLOWED = {"events.view_all_events", "search.search_events", "search.suggest"}
+
+# File-serving routes that never touch the database
+NO_DATABASE = {"static", "media"}
+
+# Set-based UPDATE/DELETEs (moderation, analytics) are explained as well as reads
+AUDITED_STATEMENTS = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+SEED_USERS = 2_000
+SEED_EVENTS = 2_000
+SEED_ROWS_PER_EVENT = 5  # rsvps, comments and ratings each
+
+PASSWORD = "audit-password"
+
+SQLITE_SCAN = re.compile(r"\bSCAN (\w+)")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def seed():
+    """Bulk-inserts enough rows that a missing index shows up in the plan."""
+    password_hash = generate_password_hash(PASSWORD)
+    now = datetime.now()
+    db.session.execute(insert(User), [
+        {
+            "email": f"user{i}@audit.rsvply.com",
+            "username": f"user{i}",
+            "password_hash": password_hash,
+            "is_admin": i == SEED_USERS,
+            "is_banned": False,
+        }
+        for i in range(1, SEED_USERS + 1)
+    ])
+    db.session.execute(insert(Event), [
+        {
+            "title": f"Event {i}",
+            "starts_at": now + timedelta(days=i % 90),
+            "ends_at": now + timedelta(days=i % 90, hours=2),
+            "address_line1": "1 Audit Way",
+            "organizer_id": i % SEED_USERS + 1,
+            # The last event is a weekly series, organized by user1
+            "recurrence_freq": RecurrenceFreq.weekly if i == SEED_EVENTS else None,
+        }
+        for i in range(1, SEED_EVENTS + 1)
+    ])
+    rows = [
+        {"event_id": e, "user_id": (e + k) % SEED_USERS + 1}
+        for e in range(1, SEED_EVENTS + 1)
+        for k in range(SEED_ROWS_PER_EVENT)
+    ]
+    db.session.execute(insert(Rsvp), [dict(r, status=RsvpStatus.going) for r in rows])
+    db.session.execute(insert(EventComment), [dict(r, body="audit") for r in rows])
+    db.session.execute(insert(Rating), [dict(r, score=3) for r in rows])
+    db.session.commit()
+    analytics.rebuild()  # so moderation's retract() finds the buckets it subtracts from
+
+
+def scenarios():
+    """(method, path, test client options) for every route, in the order a user would hit them."""
+    series = f"/event/{SEED_EVENTS}"
+    starts_at = datetime.now().replace(second=0, microsecond=0) + timedelta(days=SEED_EVENTS % 90, hours=1)
+    second_date = (starts_at + timedelta(weeks=1)).date().isoformat()
+    edit = {
+        "title": "Audit series",
+        "starts_at": starts_at.strftime("%Y-%m-%dT%H:%M"),
+        "ends_at": (starts_at + timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M"),
+        "capacity": "10",
+        "is_public": "y",
+        "address_line1": "1 Audit Way",
+        "recurrence_freq": "weekly",
+        "recurrence_interval": "1",
+        "version": "1",
+    }
+    return [
+        ("GET", "/", {}),
+        ("GET", "/registration", {}),
+        ("POST", "/registration", {"data": {"full_name": "Audit", "username": "audit", "email": "user1@audit.rsvply.com", "password": PASSWORD}}),
+        ("POST", "/login", {"data": {"username": "user1", "password": PASSWORD}}),
+        ("GET", "/events", {}),
+        ("GET", "/event/new", {}),
+        ("GET", "/event/42", {}),
+        ("GET", "/event/42/stream", {}),
+        ("POST", "/event/42", {"data": {"comment": "audit", "submit": "Submit Comment"}}),
+        ("POST", "/toggle_rsvp/42", {"data": {}}),
+        ("GET", "/rsvps", {}),
+        ("GET", "/view/user7", {}),
+        ("GET", "/edit_profile", {}),
+        ("GET", "/event/1/edit", {}),
+        ("GET", series, {}),
+        ("POST", f"/toggle_rsvp/{SEED_EVENTS}?on={second_date}", {"data": {}}),
+        ("GET", f"{series}?on={second_date}", {}),
+        ("GET", f"{series}/edit", {}),
+        ("POST", f"{series}/edit", {"data": edit}),
+        ("GET", "/search?query=Event", {}),
+        ("GET", "/search/suggest?q=ev", {}),
+        ("GET", "/logout", {}),
+        ("POST", "/login", {"data": {"username": f"user{SEED_USERS}", "password": PASSWORD}}),
+        ("POST", "/admin/ban_user/7", {"data": {}}),
+        ("GET", "/event/42/analytics", {}),
+        ("GET", "/event/42/analytics.json", {}),
+        ("GET", "/admin/moderation", {}),
+        ("POST", "/admin/moderation", {"data": {"action": "delete_comments", "usernames": "user8", "event_id": "42"}}),
+        ("POST", "/admin/moderation/api", {"json": {"action": "ban", "usernames": ["user9"]}}),
+        ("POST", "/admin/moderation/api", {"json": {"action": "delete_ratings", "event_id": 43}}),
+        ("POST", "/admin/moderation", {"data": {"action": "ban", "since": "2000-01-01T00:00", "until": "2000-01-02T00:00"}}),
+        ("POST", "/admin/moderation/api", {"json": {"action": "delete_comments", "since": "2100-01-01T00:00"}}),
+        ("POST", "/admin/moderation/api", {"json": {"action": "delete_ratings", "until": "2000-01-01T00:00"}}),
+        ("GET", "/event/2/delete", {}),
+    ]
+
+
+def capture():
+    """Runs every scenario; returns ({endpoint: [(statement, params), ...]}, endpoints visited)."""
+    captured = defaultdict(list)
+    visited = set()
+    app = current_app._get_current_object()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and statement.lstrip().upper().startswith(AUDITED_STATEMENTS):
+            captured[request.endpoint].append((statement, parameters))
+
+    def started(sender, **extra):
+        visited.add(request.endpoint)
+
+    engine = db.engine
+    sa_event.listen(engine, "before_cursor_execute", record)
+    request_started.connect(started, app)
+    try:
+        client = app.test_client()
+        for method, path, options in scenarios():
+            # Fresh app context per request (new session and g), as a real worker would have
+            with app.app_context():
+                response = client.open(path, method=method, buffered=False, **options)
+                response.close()
+            if response.status_code >= 400:
+                click.echo(f"warning: {method} {path} returned {response.status_code}")
+    finally:
+        request_started.disconnect(started, app)
+        sa_event.remove(engine, "before_cursor_execute", record)
+    return captured, visited
+
+
+def explain(statement, parameters):
+    """Returns (plan text, scanned large tables) for one statement."""
+    with db.engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # With seq scans priced out, one still showing up means no usable index
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).all()
+            plan = "\n".join(row[0] for row in rows)
+            scanned = set(POSTGRES_SCAN.findall(plan))
+        else:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            plan = "\n".join(row[-1] for row in rows)
+            scanned = set(SQLITE_SCAN.findall(plan))
+    return plan, scanned & LARGE_TABLES
+
+
+def audit(verbose: bool) -> None:
+    """Seeds, captures and explains; raises ClickException on any full scan."""
+    if inspect(db.engine).has_table("users") and db.session.execute(text("SELECT 1 FROM users LIMIT 1")).first():
+        raise click.ClickException("audit-queries seeds its own data; point DATABASE_URL at an empty database.")
+
+    db.create_all()
+    seed()
+    current_app.config["WTF_CSRF_ENABLED"] = False
+    limiter.enabled = False
+
+    captured, visited = capture()
+    # New routes must be added to scenarios() to be audited
+    failures = 0
+    for rule in current_app.url_map.iter_rules():
+        if rule.endpoint not in visited and rule.endpoint not in NO_DATABASE:
+            click.echo(f"[{rule.endpoint}] NOT AUDITED: add a request to {rule.rule} to scenarios()\n")
+            failures += 1
+
+    for endpoint, statements in captured.items():
+        seen = set()
+        for statement, parameters in statements:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            plan, scanned = explain(statement, parameters)
+            bad = bool(scanned) and endpoint not in SCAN_ALLOWED
+            failures += bool(bad)
+            if bad or verbose:
+                status = "FULL SCAN of " + ", ".join(sorted(scanned)) if bad else "ok"
+                click.echo(f"[{endpoint}] {status}\n  {' '.join(statement.split())}\n  {plan}\n")
+
+    if failures:
+        raise click.ClickException(f"{failures} route queries full-scan a large table or routes went unaudited.")
+    click.echo("All route queries use an index.")
@@ -0,0 +1,135 @@
+"""Recurrence rules for repeating events.
+
+Supports the subset of RFC 5545 RRULE that the event form exposes:
+FREQ=DAILY/WEEKLY/MONTHLY with INTERVAL, UNTIL, COUNT and EXDATE.
+Occurrences are never stored up front; they are generated lazily for
+whatever window a page asks for.
+"""
+from __future__ import annotations
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from enum import Enum as PyEnum
+from typing import Any, Iterable, Iterator
+
+
+class RecurrenceFreq(PyEnum):
+    daily = "daily"
+    weekly = "weekly"
+    monthly = "monthly"
+
+
+@dataclass(frozen=True)
+class Occurrence:
+    """One concrete instance of an event (recurring or not)."""
+    event: Any
+    starts_at: datetime
+    ends_at: datetime
+
+    @property
+    def day(self) -> date:
+        return self.starts_at.date()
+
+
+def parse_exdates(raw: str | None) -> frozenset[date]:
+    """Parses the stored EXDATE list (one YYYY-MM-DD per line or comma)."""
+    if not raw:
+        return frozenset()
+    days = set()
+    for chunk in raw.replace(",", "\n").splitlines():
+        chunk = chunk.strip()
+        if chunk:
+            days.add(date.fromisoformat(chunk))
+    return frozenset(days)
+
+
+def format_exdates(days: Iterable[date]) -> str | None:
+    days = sorted(set(days))
+    return "\n".join(d.isoformat() for d in days) or None
+
+
+def _add_months(start: datetime, months: int) -> datetime | None:
+    """Shifts by whole months; returns None if the day doesn't exist (RFC 5545 skips it)."""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    if start.day > monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+
+def _candidates(
+    dtstart: datetime,
+    freq: RecurrenceFreq,
+    interval: int,
+    first_useful: datetime,
+) -> Iterator[tuple[int, datetime]]:
+    """Yields (index, start) for every instance the rule generates, skipping
+    straight to the first one that could end after ``first_useful``."""
+    if freq is RecurrenceFreq.monthly:
+        # Months have uneven lengths and invalid days don't count, so walk them.
+        index, months = 0, 0
+        while True:
+            start = _add_months(dtstart, months)
+            if start is not None:
+                yield index, start
+                index += 1
+            months += interval
+    else:
+        step = timedelta(days=interval * (7 if freq is RecurrenceFreq.weekly else 1))
+        index = 0
+        if first_useful > dtstart:
+            index = (first_useful - dtstart) // step
+        while True:
+            yield index, dtstart + index * step
+            index += 1
+
+
+def expand(
+    event: Any,
+    window_start: datetime,
+    window_end: datetime,
+) -> Iterator[Occurrence]:
+    """Lazily yields the occurrences of ``event`` overlapping [window_start, window_end)."""
+    duration = event.ends_at - event.starts_at
+    if event.recurrence_freq is None:
+        if event.starts_at < window_end and event.ends_at > window_start:
+            yield Occurrence(event, event.starts_at, event.ends_at)
+        return
+
+    exdates = parse_exdates(event.recurrence_exdates)
+    for index, start in _candidates(
+        event.starts_at,
+        event.recurrence_freq,
+        event.recurrence_interval or 1,
+        window_start - duration,
+    ):
+        if event.recurrence_count is not None and index >= event.recurrence_count:
+            return
+        if event.recurrence_until is not None and start > event.recurrence_until:
+            return
+        if start >= window_end:
+            return
+        if start + duration <= window_start or start.date() in exdates:
+            continue
+        yield Occurrence(event, start, start + duration)
+
+
+def occurrence_on(event: Any, day: date) -> Occurrence | None:
+    """Returns the occurrence of ``event`` starting on ``day``, if its rule produces one."""
+    start = datetime.combine(day, event.starts_at.time())
+    for occ in expand(event, start, start + (event.ends_at - event.starts_at)):
+        if occ.starts_at == start:
+            return occ
+    return None
+
+
+def expand_all(
+    events: Iterable[Any],
+    window_start: datetime,
+    window_end: datetime,
+) -> list[Occurrence]:
+    """Expands a set of events for a listing, ordered by start time."""
+    occurrences = [occ for event in events for occ in expand(event, window_start, window_end)]
+    occurrences.sort(key=lambda occ: occ.starts_at)
+    return occurrences
@@ -0,0 +1,345 @@
+"""Search-as-you-type suggestions from an in-memory prefix index.
+
+The index covers the titles of upcoming public events, plus the categories and
+organizers of those events.  Each entry is weighted by RSVPs: an event by its
+``going`` RSVPs, a category or organizer by the total over its indexed events.
+Every word of a label starts a key, so "jaz" finds "Friday Jazz Night".
+
+All keys sit in one sorted list searched with ``bisect``, so a lookup never
+touches the database.  The index is loaded on first use.  The event views then
+keep it current (``add_event``/``remove_event``/``adjust_rsvps``), and it is
+reloaded in the background every ``TYPEAHEAD_REFRESH_SECONDS``.  The reload
+drops events that have ended and picks up changes made by other workers.
+Memory is bounded: at most ``TYPEAHEAD_MAX_EVENTS`` events are indexed (the
+least RSVP'd make way), with at most ``MAX_WORDS`` keys of ``KEY_CHARS`` each
+(roughly 1 KB per event).
+"""
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime
+
+from flask import current_app
+
+MAX_WORDS = 8
+KEY_CHARS = 48
+
+# A prefix matching more keys than this is answered by walking entries in
+# weight order instead, which finds the top few quickly when matches are dense
+SCAN_LIMIT = 1024
+
+# Updates that leave the index in the same state however often they're applied
+REPLAYED = {"put_event", "drop_event"}
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.casefold().split())[:KEY_CHARS]
+
+
+def label_keys(label: str) -> tuple[str, ...]:
+    """One key per word, each running to the end of the label."""
+    words = " ".join(label.casefold().split()).split(" ")[:MAX_WORDS]
+    return tuple(sorted({normalize(" ".join(words[i:])) for i in range(len(words)) if words[i]}))
+
+
+@dataclass(slots=True)
+class Entry:
+    kind: str  # "event", "category" or "organizer"
+    id: int
+    label: str
+    # "\nkey1\nkey2...": one substring test checks every key for a prefix
+    haystack: str
+    weight: int = 0
+    events: int = 0  # category/organizer: indexed events that reference it
+
+    @classmethod
+    def of(cls, kind: str, id: int, label: str, weight: int = 0, events: int = 0) -> Entry:
+        return cls(kind, id, label, "".join("\n" + key for key in label_keys(label)), weight, events)
+
+    @property
+    def keys(self) -> list[str]:
+        return self.haystack.split("\n")[1:]
+
+
+@dataclass(frozen=True)
+class EventRecord:
+    """What the index needs from an Event, detached from the session."""
+    id: int
+    title: str
+    organizer: tuple[int, str]  # (user id, username)
+    categories: tuple[tuple[int, str], ...]  # (category id, name)
+    weight: int | None = None  # None keeps the indexed RSVP count
+
+
+def parents_of(record: EventRecord) -> list[tuple[str, int, str]]:
+    return [("organizer", *record.organizer)] + [("category", *c) for c in record.categories]
+
+
+class PrefixIndex:
+    """The data structure itself; not thread-safe (``Typeahead`` locks around it)."""
+
+    def __init__(self, max_events: int):
+        self.max_events = max_events
+        self.entries: dict[tuple[str, int], Entry] = {}
+        self.parents: dict[int, tuple[tuple[str, int], ...]] = {}  # event id -> category/organizer keys
+        self.keys: list[tuple[str, str, int]] = []  # sorted (key, kind, id)
+        self.ranked: list[tuple[int, str, int]] = []  # sorted (-weight, kind, id)
+
+    @classmethod
+    def build(cls, records: list[EventRecord], max_events: int) -> PrefixIndex:
+        """Bulk load: sorts once instead of inserting key by key."""
+        index = cls(max_events)
+        for record in records[:max_events]:
+            weight = record.weight or 0
+            index.entries["event", record.id] = Entry.of("event", record.id, record.title, weight)
+            for kind, id, label in parents_of(record):
+                parent = index.entries.get((kind, id))
+                if parent is None:
+                    parent = index.entries[kind, id] = Entry.of(kind, id, label)
+                parent.events += 1
+                parent.weight += weight
+            index.parents[record.id] = tuple((kind, id) for kind, id, _ in parents_of(record))
+        entries = index.entries.values()
+        index.keys = sorted((key, e.kind, e.id) for e in entries for key in e.keys)
+        index.ranked = sorted((-e.weight, e.kind, e.id) for e in entries)
+        return index
+
+    def _insert(self, entry: Entry) -> None:
+        self.entries[entry.kind, entry.id] = entry
+        for key in entry.keys:
+            insort(self.keys, (key, entry.kind, entry.id))
+        insort(self.ranked, (-entry.weight, entry.kind, entry.id))
+
+    def _delete(self, entry: Entry) -> None:
+        del self.entries[entry.kind, entry.id]
+        for key in entry.keys:
+            del self.keys[bisect_left(self.keys, (key, entry.kind, entry.id))]
+        del self.ranked[bisect_left(self.ranked, (-entry.weight, entry.kind, entry.id))]
+
+    def _reweight(self, entry: Entry, delta: int) -> None:
+        del self.ranked[bisect_left(self.ranked, (-entry.weight, entry.kind, entry.id))]
+        entry.weight += delta
+        insort(self.ranked, (-entry.weight, entry.kind, entry.id))
+
+    def _evict(self) -> None:
+        """Makes room by dropping the least RSVP'd event."""
+        for _, kind, id in reversed(self.ranked):
+            if kind == "event":
+                self.drop_event(id)
+                return
+
+    def put_event(self, record: EventRecord) -> None:
+        """Adds an event, or replaces it with its new title/organizer/categories."""
+        previous = self.entries.get(("event", record.id))
+        weight = record.weight if record.weight is not None else (previous.weight if previous else 0)
+        if previous is not None:
+            self.drop_event(record.id)
+        elif len(self.parents) >= self.max_events:
+            self._evict()
+
+        self._insert(Entry.of("event", record.id, record.title, weight))
+        parents = parents_of(record)
+        for kind, id, label in parents:
+            parent = self.entries.get((kind, id))
+            if parent is None:
+                self._insert(Entry.of(kind, id, label, weight, events=1))
+            else:
+                parent.events += 1
+                self._reweight(parent, weight)
+        self.parents[record.id] = tuple((kind, id) for kind, id, _ in parents)
+
+    def drop_event(self, event_id: int) -> None:
+        entry = self.entries.get(("event", event_id))
+        if entry is None:
+            return
+        self._delete(entry)
+        for key in self.parents.pop(event_id):
+            parent = self.entries[key]
+            parent.events -= 1
+            if parent.events:
+                self._reweight(parent, -entry.weight)
+            else:
+                self._delete(parent)
+
+    def adjust(self, event_id: int, delta: int) -> None:
+        entry = self.entries.get(("event", event_id))
+        if entry is None:
+            return
+        self._reweight(entry, delta)
+        for key in self.parents[event_id]:
+            self._reweight(self.entries[key], delta)
+
+    def search(self, prefix: str, limit: int) -> list[Entry]:
+        """The ``limit`` heaviest entries with a key starting with ``prefix``."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        lo = bisect_left(self.keys, (prefix,))
+        hi = bisect_left(self.keys, (prefix + "\uffff",), lo)
+        if hi - lo <= SCAN_LIMIT:
+            matches = {(kind, id) for _, kind, id in self.keys[lo:hi]}
+            return heapq.nsmallest(
+                limit,
+                (self.entries[key] for key in matches),
+                key=lambda e: (-e.weight, e.kind, e.id),
+            )
+        found = []
+        needle = "\n" + prefix
+        for _, kind, id in self.ranked:
+            entry = self.entries[kind, id]
+            if needle in entry.haystack:
+                found.append(entry)
+                if len(found) == limit:
+                    break
+        return found
+
+
+def event_record(event) -> EventRecord:
+    return EventRecord(
+        id=event.id,
+        title=event.title,
+        organizer=(event.organizer.id, event.organizer.username),
+        categories=tuple((c.id, c.name) for c in event.categories),
+    )
+
+
+def is_upcoming(event, now: datetime) -> bool:
+    if event.is_recurring:
+        return event.recurrence_until is None or event.recurrence_until >= now
+    return event.ends_at >= now
+
+
+class Typeahead:
+    """Per-worker suggestion index, kept in step with the event views."""
+
+    def __init__(self, app=None):
+        self.max_events = 20_000
+        self.refresh_seconds = 300.0
+        self._index: PrefixIndex | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        # Updates made while a background reload runs, replayed onto its result
+        self._pending: list | None = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.max_events = app.config.get("TYPEAHEAD_MAX_EVENTS", self.max_events)
+        self.refresh_seconds = app.config.get("TYPEAHEAD_REFRESH_SECONDS", self.refresh_seconds)
+        # A new app may point at another database; load from it on first use
+        with self._lock:
+            self._index = None
+            self._pending = None
+
+    def load(self) -> PrefixIndex:
+        """Builds a fresh index from the database (needs an app context)."""
+        from sqlalchemy import func, or_, select
+
+        from app import db
+        from app.models import Category, Event, Rsvp, RsvpStatus, User, event_categories
+
+        now = datetime.now()
+        going = (
+            select(Rsvp.event_id, func.count().label("n"))
+            .where(Rsvp.status == RsvpStatus.going)
+            .group_by(Rsvp.event_id)
+            .subquery()
+        )
+        weight = func.coalesce(going.c.n, 0)
+        upcoming = or_(
+            Event.ends_at >= now,
+            Event.recurrence_freq.isnot(None) & (Event.recurrence_until.is_(None) | (Event.recurrence_until >= now)),
+        )
+        rows = db.session.execute(
+            select(Event.id, Event.title, User.id, User.username, weight)
+            .join(User, Event.organizer_id == User.id)
+            .outerjoin(going, going.c.event_id == Event.id)
+            .where(Event.is_public & upcoming)
+            .order_by(weight.desc())
+            .limit(self.max_events)
+        ).all()
+        categories: dict[int, list[tuple[int, str]]] = {}
+        for event_id, category_id, name in db.session.execute(
+            select(event_categories.c.event_id, Category.id, Category.name).join(Category)
+        ):
+            categories.setdefault(event_id, []).append((category_id, name))
+
+        return PrefixIndex.build([
+            EventRecord(event_id, title, (user_id, username), tuple(categories.get(event_id, ())), n)
+            for event_id, title, user_id, username, n in rows
+        ], self.max_events)
+
+    def _install(self, index: PrefixIndex | None) -> None:
+        with self._lock:
+            if index is not None:
+                # Only the idempotent updates are replayed: the load may already
+                # have counted an RSVP whose adjust arrived while it ran, and
+                # adding it again would count it twice.  An adjust the load
+                # missed is picked up by the next reload.
+                for method, *args in self._pending or ():
+                    if method in REPLAYED:
+                        getattr(index, method)(*args)
+                self._index = index
+            self._loaded_at = time.monotonic()
+            self._pending = None
+
+    def _begin_load(self) -> bool:
+        with self._lock:
+            if self._pending is not None:
+                return False
+            self._pending = []
+            return True
+
+    def _reload(self, app) -> None:
+        index = None
+        try:
+            with app.app_context():
+                index = self.load()
+        except Exception:
+            logger.exception("typeahead reload failed; keeping the current index")
+        self._install(index)
+
+    def suggest(self, prefix: str, limit: int = 8) -> list[Entry]:
+        if self._index is None:
+            self._begin_load()
+            index = None
+            try:
+                index = self.load()
+            finally:
+                # Even if the load failed, so updates stop queueing for it
+                self._install(index)
+        elif time.monotonic() - self._loaded_at > self.refresh_seconds and self._begin_load():
+            threading.Thread(
+                target=self._reload, args=(current_app._get_current_object(),),
+                name="typeahead-reload", daemon=True,
+            ).start()
+        with self._lock:
+            return self._index.search(prefix, limit)
+
+    def _apply(self, method: str, *args) -> None:
+        with self._lock:
+            if self._index is not None:
+                getattr(self._index, method)(*args)
+            # A load in progress may have read the database before this change
+            if self._pending is not None:
+                self._pending.append((method, *args))
+
+    def add_event(self, event) -> None:
+        """Call after committing a new or edited event."""
+        if event.is_public and is_upcoming(event, datetime.now()):
+            self._apply("put_event", event_record(event))
+        else:
+            self._apply("drop_event", event.id)
+
+    def remove_event(self, event_id: int) -> None:
+        self._apply("drop_event", event_id)
+
+    def adjust_rsvps(self, event_id: int, delta: int) -> None:
+        self._apply("adjust", event_id, delta)
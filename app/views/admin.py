@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+
+from flask import flash, jsonify, redirect, render_template, request, url_for
+from flask_login import current_user, login_required
+
+from app import analytics, db, moderation
+from app.forms import ModerationForm
+from app.models import User
+
+@login_required
+def ban_user(user_id):
+    if not current_user.is_admin:
+        flash("You are not authorized to perform this action.", "error")
+        return redirect(url_for("auth.home_page"))
+
+    user = User.query.get_or_404(user_id)
+
+    if user.is_admin:
+        flash("You cannot ban another admin.", "error")
+        return redirect(url_for("profiles.view_profile", username=user.username))
+
+    if user.is_banned:
+        user.is_banned = False
+        flash(f"{user.username} has been unbanned.", "success")
+    else:
+        user.is_banned = True
+        flash(f"{user.username} has been banned.", "success")
+
+    db.session.commit()
+    return redirect(url_for("profiles.view_profile", username=user.username))
+
+
+def moderation_criteria(usernames, event_id, since, until):
+    if isinstance(usernames, str):
+        usernames = usernames.replace(",", "\n").splitlines()
+    return moderation.Criteria(
+        usernames=[u.strip() for u in usernames or [] if u.strip()],
+        event_id=event_id,
+        since=since,
+        until=until,
+    )
+
+def api_criteria(body):
+    """Criteria from a moderation API body; raises ValueError on a wrongly typed field."""
+    if not isinstance(body, dict):
+        raise ValueError("Expected a JSON object.")
+    usernames = body.get("usernames")
+    if usernames is not None and not (
+        isinstance(usernames, str) or isinstance(usernames, list) and all(isinstance(u, str) for u in usernames)
+    ):
+        raise ValueError("usernames must be a string or a list of strings.")
+    event_id = body.get("event_id")
+    if event_id is not None and (not isinstance(event_id, int) or isinstance(event_id, bool)):
+        raise ValueError("event_id must be an integer.")
+    bounds = {}
+    for name in ("since", "until"):
+        value = body.get(name)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{name} must be an ISO 8601 date/time string.")
+        bound = datetime.fromisoformat(value) if value else None
+        if bound is not None and bound.tzinfo is not None:
+            bound = bound.astimezone(timezone.utc).replace(tzinfo=None)  # created_at is naive UTC
+        bounds[name] = bound
+    return moderation_criteria(usernames, event_id, bounds["since"], bounds["until"])
+
+# Bulk ban/unban and bulk comment/rating removal
+@login_required
+def moderation_console():
+    if not current_user.is_admin:
+        flash("You are not authorized to perform this action.", "error")
+        return redirect(url_for("auth.home_page"))
+
+    form = ModerationForm()
+    if form.validate_on_submit():
+        criteria = moderation_criteria(form.usernames.data, form.event_id.data, form.since.data, form.until.data)
+        try:
+            affected = moderation.run(form.action.data, criteria)
+        except ValueError as e:
+            flash(str(e), "error")
+        else:
+            flash(f"{dict(form.action.choices)[form.action.data]}: {affected} affected.", "success")
+        return redirect(url_for("admin.moderation_console"))
+    return render_template("moderation.html", form=form, now_utc=analytics.utcnow())
+
+# JSON: {"action": "delete_comments", "usernames": [...], "event_id": 1, "since": "2026-01-01T00:00"} (times in UTC)
+@login_required
+def moderation_api():
+    if not current_user.is_admin:
+        return jsonify(error="forbidden"), 403
+
+    body = request.get_json(silent=True) or {}
+    try:
+        criteria = api_criteria(body)
+        affected = moderation.run(body.get("action"), criteria)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(action=body["action"], affected=affected)
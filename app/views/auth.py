@@ -0,0 +1,91 @@
+from flask import flash, redirect, render_template, request, url_for
+from flask_login import current_user, login_required, login_user, logout_user
+
+from app import db, limiter
+from app.forms import LoginForm, RegistrationForm
+from app.models import User
+
+admin_initialized = False
+
+def default_admin():
+    global admin_initialized
+    if admin_initialized:
+        return
+
+    existing_admin = User.query.filter_by(is_admin=True).first()
+    if existing_admin:
+        admin_initialized = True
+        return
+
+    admin_user = User.query.filter_by(username="ADMIN").first()
+    if not admin_user:
+        admin_user = User(
+            username="ADMIN",
+            email="ADMIN@gmail.com",
+            full_name="ADMIN",
+        )
+
+    admin_user.set_password("12345")
+    admin_user.is_admin = True
+
+    db.session.add(admin_user)
+    db.session.commit()
+    admin_initialized = True
+    print("Default ADMIN user created (username=ADMIN, password=12345)")
+
+def home_page():
+    return redirect(url_for("auth.login"))
+
+@limiter.limit("register", write=True)
+def register():
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        full_name = form.full_name.data
+        username = form.username.data #1
+        email = form.email.data
+        password = form.password.data #1
+        #users = User.query.all()
+        existing_user = User.query.filter_by(email=email).first()
+        if existing_user:
+            flash("Email is taken.", 'error')
+            return redirect(url_for("auth.register"))
+        u = User(username=username, email=email, full_name=full_name)
+        u.set_password(password)
+        db.session.add(u)#1
+        db.session.commit() #1
+        print(f"User registered: {username}")
+        return redirect("/")
+    return render_template("registration.html", form=form)
+
+@limiter.limit("login")
+def login():
+    if current_user.is_authenticated:
+        flash("You are already logged in.")
+        return redirect(f'/view/{current_user.username}')
+    form = LoginForm()
+    if form.validate_on_submit():
+        username = form.username.data
+        password = form.password.data
+        user = User.query.filter_by(username=username).first()
+        if user and user.check_password(password):
+
+            if user.is_banned:
+                flash("Your account has been banned. Please contact an admin.", "error")
+                return redirect(url_for("auth.login"))
+            
+            login_user(user)
+            flash('Logged in successfully', 'success')
+            next_page = request.args.get('next')
+            if next_page:
+                return redirect(next_page)
+            return redirect(url_for("profiles.view_profile", username=username))
+        else:
+            flash('Invalid username or password.', 'error')
+    return render_template("login.html", form=form)
+
+# Log out
+@login_required
+def logout():
+    logout_user()
+    flash('Logged out succesfully', 'success')
+    return redirect("/")
@@ -0,0 +1,408 @@
+from collections import deque
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+from types import SimpleNamespace
+
+from flask import Response, flash, jsonify, redirect, render_template, request, stream_with_context, url_for
+from flask_login import current_user, login_required
+from sqlalchemy import update
+
+from app import analytics, broker, db, limiter, typeahead
+from app.forms import CommentForm, EditEventForm, EventForm, RatingForm
+from app.models import Event, EventComment, EventOccurrence, Rating, Rsvp, RsvpStatus
+from app.recurrence import Occurrence, RecurrenceFreq, expand_all, format_exdates, occurrence_on, parse_exdates
+
+# How far ahead recurring events are expanded in listings and search results
+LISTING_WINDOW_DAYS = 30
+MAX_LISTING_WINDOW_DAYS = 366
+
+def list_occurrences(events, days=None):
+    """One-off events are listed as-is; recurring ones are expanded lazily,
+    and only for the next ``days`` days (1 to ``MAX_LISTING_WINDOW_DAYS``;
+    anything else falls back to ``LISTING_WINDOW_DAYS``)."""
+    if days is None or days <= 0:
+        days = LISTING_WINDOW_DAYS
+    window_start = datetime.now()
+    window_end = window_start + timedelta(days=min(days, MAX_LISTING_WINDOW_DAYS))
+    occurrences = [Occurrence(e, e.starts_at, e.ends_at) for e in events if not e.is_recurring]
+    occurrences += expand_all([e for e in events if e.is_recurring], window_start, window_end)
+    occurrences.sort(key=lambda occ: occ.starts_at)
+    return occurrences
+
+def recurrence_values(form):
+    """Column values for the recurrence fields of an EventForm/EditEventForm."""
+    freq = form.recurrence_freq.data
+    until = form.recurrence_until.data
+    return {
+        "recurrence_freq": RecurrenceFreq(freq) if freq else None,
+        "recurrence_interval": form.recurrence_interval.data or 1,
+        "recurrence_until": datetime.combine(until, time.max) if until else None,
+        "recurrence_count": form.recurrence_count.data,
+        "recurrence_exdates": format_exdates(parse_exdates(form.recurrence_exdates.data)),
+    }
+
+def apply_recurrence(event, form):
+    """Copies the recurrence fields of an EventForm/EditEventForm onto ``event``."""
+    for name, value in recurrence_values(form).items():
+        setattr(event, name, value)
+
+def edit_changes(event, form):
+    """Column -> new value for every field EditEventForm would change on ``event``.
+
+    Blank optional fields keep the current value, as they always have.
+    """
+    values = {"is_public": form.is_public.data}
+    for name in ("title", "description", "wishlist", "starts_at", "ends_at",
+                 "capacity", "address_line1", "address_line2"):
+        if getattr(form, name).data:
+            values[name] = getattr(form, name).data
+    values.update(recurrence_values(form))
+    return {name: value for name, value in values.items() if getattr(event, name) != value}
+
+# Columns that decide when each occurrence of a series is and how many it seats
+SCHEDULE_FIELDS = ("starts_at", "ends_at", "capacity", "recurrence_freq", "recurrence_interval",
+                   "recurrence_until", "recurrence_count", "recurrence_exdates")
+
+def reschedule_occurrences(event, changes):
+    """Maps the upcoming materialized occurrences of ``event`` onto the edited series.
+
+    Returns (row, occurrence) pairs, where ``occurrence`` is the row's date under
+    the new rule, or None if that date is no longer part of the series.  Past
+    rows are left alone.
+    """
+    if not event.is_recurring or not changes.keys() & set(SCHEDULE_FIELDS):
+        return []
+    series = SimpleNamespace(**{name: changes.get(name, getattr(event, name)) for name in SCHEDULE_FIELDS})
+    rows = EventOccurrence.query.filter(
+        (EventOccurrence.event_id == event.id) & (EventOccurrence.ends_at >= datetime.now())
+    ).all()
+    return [
+        (row, occurrence_on(series, row.starts_at.date()) if series.recurrence_freq else None)
+        for row in rows
+    ]
+
+def apply_reschedule(moves, changes):
+    """Re-keys (or drops) the rows paired by ``reschedule_occurrences``."""
+    for row, occurrence in moves:
+        if occurrence is None:
+            db.session.delete(row)
+            continue
+        row.starts_at, row.ends_at = occurrence.starts_at, occurrence.ends_at
+        if "capacity" in changes:
+            row.capacity = changes["capacity"]
+
+def selected_occurrence(event):
+    """Resolves ``?on=YYYY-MM-DD`` to an occurrence of ``event``.
+
+    Defaults to the next upcoming occurrence of a recurring event, or to its
+    last one once the series has ended.  Returns None only if an explicit
+    date is not part of the series.
+    """
+    if not event.is_recurring:
+        return Occurrence(event, event.starts_at, event.ends_at)
+    on = request.values.get("on")
+    if on:
+        try:
+            return event.occurrence_on(date.fromisoformat(on))
+        except ValueError:
+            return None
+    now = datetime.now()
+    upcoming = next(event.expand(now, datetime.max), None)
+    if upcoming is not None:
+        return upcoming
+    past = deque(event.expand(event.starts_at, now), maxlen=1)
+    return past[0] if past else Occurrence(event, event.starts_at, event.ends_at)
+
+def publish_seats(event, occurrence_row=None):
+    """Pushes the new seat count of an event (or one occurrence) to live watchers."""
+    source = occurrence_row or event
+    broker.publish(event.id, "seats", {
+        "on": occurrence_row.starts_at.date().isoformat() if occurrence_row else None,
+        "seats_taken": source.seats_taken,
+        "capacity": source.capacity,
+    })
+
+# A write that slipped past the gate and still lost the SQLite lock
+def database_busy(error):
+    if "database is locked" not in str(error):
+        raise error
+    db.session.rollback()
+    return "The server is busy, please try again.", 429, {"Retry-After": "1"}
+
+# http://127.0.0.1:5000/events
+def view_all_events():
+    events = Event.query.all() # get all events
+    occurrences = list_occurrences(events, request.args.get("days", type=int))
+    return render_template("hello.html", occurrences=occurrences)
+
+# http://127.0.0.1:500/event/new
+@login_required
+def create_event():
+    form = EventForm()
+    if form.validate_on_submit():
+        # Create a new Event object
+        new_event = Event(
+            title=form.title.data,
+            description=form.description.data,
+            wishlist=form.wishlist.data,
+            starts_at=form.starts_at.data,
+            ends_at=form.ends_at.data,
+            capacity=form.capacity.data,
+            is_public=form.is_public.data,
+            address_line1=form.address_line1.data,
+            address_line2=form.address_line2.data,
+            organizer_id=current_user.id,
+        )
+        apply_recurrence(new_event, form)
+
+        # If categories are part of the form (e.g. SelectMultipleField)
+        if hasattr(form, "categories") and form.categories.data:
+            new_event.categories = form.categories.data
+
+        db.session.add(new_event)
+        db.session.commit()
+        typeahead.add_event(new_event)
+
+        flash("Event created successfully!", "success")
+        return redirect(url_for("events.return_event", integer=new_event.id))
+
+    return render_template("new.html", form=form)
+
+# http://127.0.0.1:5000/event/<enter number here>
+@login_required
+@limiter.limit("comment", write=True)
+def return_event(integer):
+    event = Event.query.get(integer) # get event number
+    if event is None:
+        print("event not found") #prints to terminal
+        return ""
+    
+    occurrence = selected_occurrence(event)
+    if occurrence is None:
+        flash("This event does not take place on that date.", "error")
+        return redirect(url_for("events.return_event", integer=event.id))
+
+    # Find existing RSVP of user (if any); occurrences of a recurring event
+    # only have a row once somebody has RSVP'd to them
+    occurrence_row = None
+    if event.is_recurring:
+        occurrence_row = EventOccurrence.query.filter_by(
+            event_id=event.id,
+            starts_at=occurrence.starts_at
+        ).first()
+    rsvp = None
+    if current_user and (occurrence_row or not event.is_recurring):
+        rsvp = Rsvp.query.filter_by(
+            user_id=current_user.id,
+            event_id=event.id,
+            occurrence_id=occurrence_row.id if occurrence_row else None
+        ).first()
+    attendees = occurrence_row.rsvps if occurrence_row else ([] if event.is_recurring else event.rsvps)
+
+    comment_form = CommentForm() # create comment form
+    rating_form = RatingForm() # create rating form
+
+    #comment and rating form
+    if comment_form.validate_on_submit() and comment_form.submit.data:
+            new_comment = EventComment(event_id=event.id, user_id=current_user.id, body=comment_form.comment.data)
+            db.session.add(new_comment)
+            analytics.record(event.id, comments=1)
+            db.session.commit()
+            broker.publish(event.id, "comment", {"user": current_user.username, "body": new_comment.body})
+            return redirect(request.full_path)
+    
+    if rating_form.validate_on_submit() and rating_form.submit.data:
+        existing_rating = Rating.query.filter_by(user_id=current_user.id, event_id=event.id).first()
+        if existing_rating:
+            analytics.record(event.id, rating_sum=rating_form.score.data - existing_rating.score)
+            existing_rating.score = rating_form.score.data
+            rating = existing_rating
+        else:
+            rating = Rating(score=rating_form.score.data, user_id=current_user.id, event_id=event.id)
+            db.session.add(rating)
+            analytics.record(event.id, ratings=1, rating_sum=rating.score)
+        
+        db.session.commit()
+        # Watchers replace the line with this id, or append it if it is new
+        broker.publish(event.id, "rating", {"id": rating.id, "user": current_user.username, "score": rating.score})
+        return redirect(request.full_path)
+
+    comments = event.comments
+    upcoming = []
+    if event.is_recurring:
+        upcoming = list(islice(event.expand(datetime.now(), datetime.max), 10))
+    if occurrence_row is not None:
+        seats_taken = occurrence_row.seats_taken
+    else:
+        seats_taken = 0 if event.is_recurring else event.seats_taken
+    return render_template("return_ev.html", event=event, comment_form=comment_form, rating_form=rating_form, comments=comments, rsvp=rsvp,
+                           occurrence=occurrence, attendees=attendees, upcoming=upcoming, seats_taken=seats_taken)
+
+# Live seat counts, comments and ratings for return_ev.html (Server-Sent Events)
+@login_required
+def event_stream(integer):
+    if db.session.get(Event, integer) is None:
+        return "", 404
+    # Don't pin a pooled connection for the lifetime of the stream
+    db.session.close()
+    response = Response(stream_with_context(broker.stream(integer)), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+# Organizer dashboard; reads only the activity rollups, never the raw tables
+@login_required
+def event_analytics(integer):
+    event = Event.query.get(integer)
+    if event is None:
+        flash("Event does not exist.", "error")
+        return redirect(url_for("auth.login"))
+    if event.organizer != current_user and not current_user.is_admin:
+        flash("You can only view analytics for events you own.", "error")
+        return redirect(url_for("auth.login"))
+    return render_template("analytics.html", event=event, stats=analytics.dashboard(event.id))
+
+@login_required
+def event_analytics_json(integer):
+    event = Event.query.get_or_404(integer)
+    if event.organizer != current_user and not current_user.is_admin:
+        return jsonify(error="forbidden"), 403
+    return jsonify(analytics.dashboard(event.id))
+
+# http://127.0.0.1:5000/event/<enter number here>/delete
+def delete_event(integer):
+    del_rec = Event.query.get(integer) # get event number
+    if current_user == del_rec.organizer or current_user.is_admin:
+        db.session.delete(del_rec) #delete
+        db.session.commit()
+        typeahead.remove_event(integer)
+        flash("event successfully deleted", "success")
+        return redirect(url_for("auth.login"))
+    else:
+        flash("You must own a event to delete it.", "error")
+        return redirect(url_for("auth.login"))
+
+@login_required
+def edit_event(integer):
+    form = EditEventForm()
+    event = Event.query.get(integer) # get event number
+    if event == None:
+        flash("Event does not exist.", "error")
+        return redirect(url_for("auth.login"))
+    else:
+        if event.organizer != current_user:
+            flash("You cannot edit events you don't own.", "error")
+            return redirect(url_for("auth.login"))
+    conflicts = []
+    if request.method == "POST":
+        if form.validate_on_submit():
+            #edit event: compare-and-set on the version the form was loaded at,
+            #writing only the columns that actually change
+            changes = edit_changes(event, form)
+            # Dates people already RSVP'd to move with the series, or block the edit
+            moves = reschedule_occurrences(event, changes)
+            stranded = [row for row, occurrence in moves if occurrence is None and row.rsvps]
+            if stranded:
+                days = ", ".join(row.starts_at.strftime("%Y-%m-%d") for row in stranded)
+                flash(f"This change would cancel dates people have RSVP'd to ({days}). "
+                      "Keep those dates in the series, or add them as exceptions once the RSVPs are gone.", "error")
+                return render_template("edit_event.html", form=form, event=event, conflicts=conflicts)
+            updated = True
+            if changes:
+                updated = db.session.execute(
+                    update(Event)
+                    .where((Event.id == event.id) & (Event.version == form.version.data))
+                    .values(**changes, version=Event.version + 1),
+                    execution_options={"synchronize_session": False},
+                ).rowcount
+                if updated:
+                    apply_reschedule(moves, changes)
+                db.session.commit()
+            if updated:
+                typeahead.add_event(event)
+                flash("event successfully changed.", "success")
+                return redirect(f"/event/{integer}")
+
+            # Someone else saved first: show what differs and let the user resubmit
+            db.session.refresh(event)
+            conflicts = [
+                (getattr(form, name).label.text, value, getattr(event, name))
+                for name, value in edit_changes(event, form).items()
+            ]
+            form.version.data = event.version
+            flash("This event was changed by someone else while you were editing. Review the differences and apply again.", "error")
+            return render_template("edit_event.html", form=form, event=event, conflicts=conflicts), 409
+    else:
+        # Pre-populate form with existing event data
+        form = EditEventForm(obj=event)
+
+    # Pass both form and event to template
+    return render_template("edit_event.html", form=form, event=event, conflicts=conflicts)
+
+@login_required
+@limiter.limit("rsvp", write=True)
+def rsvp(event_id):
+    event = Event.query.get(event_id)
+    if event is None:
+        flash("Event not found", "error")
+        return redirect(url_for("main"))
+
+    occurrence = selected_occurrence(event)
+    if occurrence is None:
+        flash("This event does not take place on that date.", "error")
+        return redirect(url_for("events.return_event", integer=event.id))
+
+    # Recurring events get a per-occurrence row the first time anyone RSVPs
+    occurrence_row = event.materialize_occurrence(occurrence) if event.is_recurring else None
+
+    # Find existing RSVP (if any)
+    rsvp = None
+    if occurrence_row is None or occurrence_row.id is not None:
+        rsvp = Rsvp.query.filter_by(
+            user_id=current_user.id,
+            event_id=event.id,
+            occurrence_id=occurrence_row.id if occurrence_row else None
+        ).first()
+
+    if rsvp is None:
+        # Create a new RSVP
+        new_rsvp = Rsvp(
+            user=current_user,
+            event=event,
+            occurrence=occurrence_row,
+            status=RsvpStatus.going, #kind of forgot we have enums for the rsvps; just set to default "going" for RSVPs to reduce project scope
+            guests_count=0
+        )
+        db.session.add(new_rsvp)
+        analytics.record(event.id, rsvps_added=1)
+        db.session.commit()
+        typeahead.adjust_rsvps(event.id, 1)
+        publish_seats(event, occurrence_row)
+        flash("Event added to RSVPs", "success")
+    elif rsvp.status == RsvpStatus.going:
+            flash("RSVP Removed", "success")
+            db.session.delete(rsvp)
+            analytics.record(event.id, rsvps_removed=1)
+            db.session.commit()
+            typeahead.adjust_rsvps(event.id, -1)
+            publish_seats(event, occurrence_row)
+
+    on = occurrence.day.isoformat() if event.is_recurring else None
+    return redirect(url_for("events.return_event", integer=event.id, on=on))
+
+
+# View RSVPs
+@login_required
+def view_rsvps():
+    rsvps = Rsvp.query.filter_by(
+        user_id=current_user.id,
+        status=RsvpStatus.going
+    ).all()
+
+    occurrences = [
+        Occurrence(r.event, r.occurrence.starts_at, r.occurrence.ends_at) if r.occurrence
+        else Occurrence(r.event, r.event.starts_at, r.event.ends_at)
+        for r in rsvps
+    ]
+
+    return render_template("rsvps.html", occurrences=occurrences)
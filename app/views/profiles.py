@@ -0,0 +1,26 @@
+from flask import flash, render_template
+from flask_login import current_user, login_required
+
+from app import db, media
+from app.forms import EditUserForm
+from app.models import User
+
+# View User Profile
+def view_profile(username):
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        flash("User not found.", 'error')
+    return render_template("user.html", user=user)
+
+@login_required
+def edit_profile():
+    form = EditUserForm()
+    if form.validate_on_submit():
+        current_user.username = form.username.data
+        if form.avatar.data:
+            try:
+                current_user.avatar_url = media.save_avatar(form.avatar.data)
+            except ValueError as e:
+                flash(str(e), "error")
+        db.session.commit()
+    return render_template("edit_user.html", user=current_user, form=form)
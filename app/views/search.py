@@ -0,0 +1,50 @@
+from flask import jsonify, render_template, request, url_for
+
+from app import db, typeahead
+from app.forms import SearchForm
+from app.models import Category, Event
+from app.views.events import list_occurrences
+
+MAX_SUGGESTIONS = 20
+
+def suggestion_url(entry):
+    if entry.kind == "event":
+        return url_for("events.return_event", integer=entry.id)
+    if entry.kind == "organizer":
+        return url_for("profiles.view_profile", username=entry.label)
+    return url_for("search.search_events", query=entry.label)  # search matches category names too
+
+def search_events():
+    form = SearchForm()
+
+    query = request.args.get('query')
+
+    if request.method == 'POST' and form.validate_on_submit():
+        query = form.search_query.data
+
+    events = []
+
+    if query:
+        events = Event.query.filter(
+            db.or_(
+                Event.title.ilike(f'%{query}%'),
+                Event.description.ilike(f'%{query}%'),
+                Event.wishlist.ilike(f'%{query}%'),
+                Event.address_line1.ilike(f'%{query}%'),
+                Event.address_line2.ilike(f'%{query}%'),
+                Event.categories.any(Category.name.ilike(f'%{query}%')),
+            )
+        ).all()
+        occurrences = list_occurrences(events, request.args.get("days", type=int))
+
+        return render_template('search_result.html', occurrences=occurrences, form=form, query=query)
+
+    return render_template('search.html', form=form)
+
+# Search box suggestions, answered from the in-memory index (app/suggest.py)
+def suggest():
+    limit = min(max(request.args.get("limit", 8, type=int), 1), MAX_SUGGESTIONS)
+    entries = typeahead.suggest(request.args.get("q", ""), limit)
+    return jsonify(suggestions=[
+        {"kind": e.kind, "label": e.label, "url": suggestion_url(e)} for e in entries
+    ])
@@ -0,0 +1,73 @@
+"""add event recurrence and per-occurrence rsvps
+
+Revision ID: 3c1f9e2ab7d4
+Revises: 654471fbb152
+Create Date: 2026-10-19 10:12:44.218301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9e2ab7d4'
+down_revision = '654471fbb152'
+branch_labels = None
+depends_on = None
+
+
+recurrence_freq = sa.Enum('daily', 'weekly', 'monthly', name='recurrence_freq')
+
+
+def upgrade():
+    recurrence_freq.create(op.get_bind(), checkfirst=True)
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recurrence_freq', recurrence_freq, nullable=True))
+        batch_op.add_column(sa.Column('recurrence_interval', sa.Integer(), server_default=sa.text('1'), nullable=False))
+        batch_op.add_column(sa.Column('recurrence_until', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('recurrence_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('recurrence_exdates', sa.Text(), nullable=True))
+
+    op.create_table('event_occurrences',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('ends_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'starts_at', name='uq_event_occurrences_event_start')
+    )
+
+    with op.batch_alter_table('rsvps', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('occurrence_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_rsvps_occurrence', 'event_occurrences', ['occurrence_id'], ['id'], ondelete='CASCADE')
+        batch_op.drop_constraint('uq_rsvps_user_event', type_='unique')
+        batch_op.create_index('idx_rsvps_occurrence', ['occurrence_id'], unique=False)
+
+    # Expression index: NULL occurrence_id (one-off events) must still be unique per user
+    op.create_index('uq_rsvps_user_event_occurrence', 'rsvps', ['user_id', 'event_id', sa.text('coalesce(occurrence_id, 0)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_rsvps_user_event_occurrence', table_name='rsvps')
+
+    with op.batch_alter_table('rsvps', schema=None) as batch_op:
+        batch_op.drop_index('idx_rsvps_occurrence')
+        batch_op.drop_constraint('fk_rsvps_occurrence', type_='foreignkey')
+        batch_op.drop_column('occurrence_id')
+        batch_op.create_unique_constraint('uq_rsvps_user_event', ['user_id', 'event_id'])
+
+    op.drop_table('event_occurrences')
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('recurrence_exdates')
+        batch_op.drop_column('recurrence_count')
+        batch_op.drop_column('recurrence_until')
+        batch_op.drop_column('recurrence_interval')
+        batch_op.drop_column('recurrence_freq')
+
+    recurrence_freq.drop(op.get_bind(), checkfirst=True)
@@ -1,5 +1,5 @@
 #from app import myapp_obj
 #myapp_obj.run()
 
-import app
-app.myapp_obj.run(debug=True)
+from app import create_app
+create_app().run(debug=True)
@@ -0,0 +1,49 @@
+import pytest
+
+from app import create_app, db
+from app.models import User
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """App factory bound to an empty SQLite database under ``tmp_path``."""
+    def make(**config):
+        return create_app({
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "WTF_CSRF_ENABLED": False,
+            "RATELIMIT_ENABLED": False,
+            "JINJA_CACHE_DIR": str(tmp_path / "jinja_cache"),
+            "MEDIA_DIR": str(tmp_path / "media"),
+            **config,
+        })
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username="alice", email="alice@rsvply.com", full_name="Alice")
+    user.set_password("password")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def logged_in(client, user):
+    client.post("/login", data={"username": "alice", "password": "password"})
+    return client
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+
+from app import analytics, db
+from app.models import ActivityRollup, Event, EventComment, Rating
+from app.moderation import Criteria, delete_content
+
+
+@pytest.fixture
+def event(user):
+    event = Event(
+        title="Book Club",
+        starts_at=datetime.now() + timedelta(days=1),
+        ends_at=datetime.now() + timedelta(days=1, hours=2),
+        organizer_id=user.id,
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def totals(event_id):
+    return db.session.execute(
+        db.select(func.sum(ActivityRollup.comments), func.sum(ActivityRollup.ratings))
+        .where(ActivityRollup.event_id == event_id)
+    ).one()
+
+
+def test_removed_content_is_taken_back_out_of_the_rollups(logged_in, event):
+    logged_in.post(f"/event/{event.id}", data={"comment": "See you there", "submit": "Submit Comment"})
+    logged_in.post(f"/event/{event.id}", data={"score": 4, "submit": "Rate"})
+    assert totals(event.id) == (1, 1)
+
+    delete_content(EventComment, Criteria(event_id=event.id))
+    delete_content(Rating, Criteria(event_id=event.id))
+    assert totals(event.id) == (0, 0)
+
+
+def test_missing_bucket_is_logged(event, user, caplog):
+    comment = EventComment(event_id=event.id, user_id=user.id, body="No bucket for me")
+    db.session.add(comment)
+    db.session.commit()
+
+    analytics.retract(EventComment, [comment.id])
+    assert "no rollup bucket" in caplog.text
@@ -0,0 +1,68 @@
+import gzip
+import os
+
+import pytest
+from flask import url_for
+
+from app.assets import IMMUTABLE
+
+
+@pytest.fixture
+def static(app, tmp_path):
+    folder = tmp_path / "static"
+    folder.mkdir()
+    (folder / "site.css").write_text("body { color: red; }")
+    app.static_folder = str(folder)
+    return folder
+
+
+def precompress(path):
+    with open(str(path) + ".gz", "wb") as f:
+        f.write(gzip.compress(path.read_bytes(), mtime=0))
+
+
+def static_url(app, filename):
+    with app.test_request_context():
+        return url_for("static", filename=filename)
+
+
+def test_url_changes_with_content(app, static):
+    before = static_url(app, "site.css")
+    assert "?v=" in before
+    (static / "site.css").write_text("body { color: blue; }")
+    assert static_url(app, "site.css") != before
+
+
+def test_only_the_current_fingerprint_is_immutable(app, client, static):
+    url = static_url(app, "site.css")
+    assert client.get(url).headers["Cache-Control"] == IMMUTABLE
+    assert client.get("/static/site.css?v=stale").headers.get("Cache-Control") != IMMUTABLE
+    assert client.get("/static/site.css").headers.get("Cache-Control") != IMMUTABLE
+
+
+def test_serves_gzip_only_when_accepted(app, client, static):
+    precompress(static / "site.css")
+    url = static_url(app, "site.css")
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.mimetype == "text/css"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == b"body { color: red; }"
+
+    response = client.get(url)
+    assert "Content-Encoding" not in response.headers
+    assert response.data == b"body { color: red; }"
+
+
+def test_stale_variant_is_not_served(app, client, static):
+    precompress(static / "site.css")
+    source = static / "site.css"
+    source.write_text("body { color: blue; }")
+    stat = os.stat(str(source) + ".gz")
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    response = client.get(static_url(app, "site.css"), headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == b"body { color: blue; }"
+    assert response.headers["Cache-Control"] == IMMUTABLE
@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event as sa_event
+
+from app import analytics, db
+from app.models import ActivityRollup, Event, EventOccurrence, Rsvp
+from app.recurrence import RecurrenceFreq
+
+
+@pytest.fixture
+def ended_series(user):
+    starts_at = (datetime.now() - timedelta(days=10)).replace(microsecond=0)
+    event = Event(
+        title="Morning Run",
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(hours=1),
+        organizer_id=user.id,
+        recurrence_freq=RecurrenceFreq.daily,
+        recurrence_count=3,
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def test_ended_series_renders_its_last_occurrence(logged_in, ended_series):
+    response = logged_in.get(f"/event/{ended_series.id}")
+    assert response.status_code == 200
+    assert b"Morning Run" in response.data
+
+
+def test_date_outside_series_redirects_once(logged_in, ended_series):
+    response = logged_in.get(f"/event/{ended_series.id}?on=2000-01-01")
+    assert response.status_code == 302
+    response = logged_in.get(response.location)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("days", ["99999999", "-5", "0", "junk"])
+def test_listing_window_is_clamped(logged_in, ended_series, days):
+    assert logged_in.get(f"/events?days={days}").status_code == 200
+
+
+def test_deleting_an_event_drops_its_rollups(logged_in, ended_series):
+    event_id = ended_series.id
+    analytics.record(event_id, comments=2)
+    db.session.commit()
+    assert ActivityRollup.query.filter_by(event_id=event_id).count() == 1
+
+    logged_in.get(f"/event/{event_id}/delete")
+    db.session.expire_all()
+    assert db.session.get(Event, event_id) is None
+    assert ActivityRollup.query.filter_by(event_id=event_id).count() == 0
+
+
+@pytest.fixture
+def weekly_series(user):
+    starts_at = (datetime.now() + timedelta(days=1)).replace(hour=18, minute=0, second=0, microsecond=0)
+    event = Event(
+        title="Chess Club",
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(hours=2),
+        capacity=1,
+        address_line1="1 Main St",
+        organizer_id=user.id,
+        recurrence_freq=RecurrenceFreq.weekly,
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def edit_form(event, **fields):
+    data = {
+        "title": event.title,
+        "starts_at": event.starts_at.strftime("%Y-%m-%dT%H:%M"),
+        "ends_at": event.ends_at.strftime("%Y-%m-%dT%H:%M"),
+        "capacity": event.capacity or "",
+        "is_public": "y",
+        "address_line1": event.address_line1,
+        "recurrence_freq": event.recurrence_freq.value if event.recurrence_freq else "",
+        "recurrence_interval": event.recurrence_interval,
+        "version": event.version,
+    }
+    data.update(fields)
+    return data
+
+
+def test_editing_a_series_moves_its_rsvpd_dates(logged_in, weekly_series):
+    next_week = (weekly_series.starts_at + timedelta(weeks=1)).date()
+    logged_in.post(f"/toggle_rsvp/{weekly_series.id}?on={next_week}")
+    row = EventOccurrence.query.filter_by(event_id=weekly_series.id).one()
+
+    moved = weekly_series.starts_at + timedelta(hours=1)
+    response = logged_in.post(f"/event/{weekly_series.id}/edit", data=edit_form(
+        weekly_series,
+        starts_at=moved.strftime("%Y-%m-%dT%H:%M"),
+        ends_at=(moved + timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M"),
+        capacity=5,
+    ))
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert (row.starts_at.hour, row.capacity, row.seats_taken) == (19, 5, 1)
+    page = logged_in.get(f"/event/{weekly_series.id}?on={next_week}").get_data(as_text=True)
+    assert "Remove RSVP" in page
+    assert Rsvp.query.one().occurrence_id == row.id
+
+
+def test_edit_that_cancels_an_rsvpd_date_is_refused(logged_in, weekly_series):
+    next_week = (weekly_series.starts_at + timedelta(weeks=1)).date()
+    logged_in.post(f"/toggle_rsvp/{weekly_series.id}?on={next_week}")
+
+    response = logged_in.post(f"/event/{weekly_series.id}/edit", data=edit_form(
+        weekly_series, recurrence_exdates=next_week.isoformat(),
+    ))
+    assert response.status_code == 200
+    assert next_week.isoformat() in response.get_data(as_text=True)
+    db.session.expire_all()
+    assert weekly_series.recurrence_exdates is None
+    assert EventOccurrence.query.filter_by(event_id=weekly_series.id).count() == 1
+
+
+def test_first_rsvps_racing_for_one_date_share_its_row(weekly_series, monkeypatch):
+    occurrence = next(weekly_series.expand(datetime.now(), datetime.max))
+    row = weekly_series.materialize_occurrence(occurrence)
+    db.session.commit()
+
+    # The other request's row landed between this one's lookup and its INSERT
+    query_class = type(EventOccurrence.query)
+    first = query_class.first
+    monkeypatch.setattr(query_class, "first", lambda self: None)
+    try:
+        assert weekly_series.materialize_occurrence(occurrence).id == row.id
+    finally:
+        monkeypatch.setattr(query_class, "first", first)
+
+
+@pytest.fixture
+def concert(user):
+    starts_at = (datetime.now() + timedelta(days=3)).replace(hour=20, minute=0, second=0, microsecond=0)
+    event = Event(
+        title="Concert",
+        description="Bring earplugs",
+        wishlist="Snacks",
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(hours=3),
+        capacity=50,
+        address_line1="2 Hall Rd",
+        organizer_id=user.id,
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def test_stale_edit_is_rejected_with_the_differences(logged_in, concert):
+    loaded = edit_form(concert)
+    assert logged_in.post(f"/event/{concert.id}/edit", data=dict(loaded, title="Their title")).status_code == 302
+
+    response = logged_in.post(f"/event/{concert.id}/edit", data=dict(loaded, title="My title", capacity=60))
+    assert response.status_code == 409
+    page = response.get_data(as_text=True)
+    rows = page[page.index("<tbody>"):page.index("</tbody>")]
+    assert "<td>Title</td><td>My title</td><td>Their title</td>" in rows
+    assert "<td>Capacity</td><td>60</td><td>50</td>" in rows
+    assert "Address" not in rows  # unchanged fields aren't listed
+    assert 'name="version" type="hidden" value="2"' in page
+
+    db.session.expire_all()
+    assert (concert.title, concert.capacity, concert.version) == ("Their title", 50, 2)
+
+
+def test_edit_writes_only_the_changed_columns(app, logged_in, concert):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE events"):
+            statements.append(statement)
+
+    sa_event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = logged_in.post(f"/event/{concert.id}/edit", data=edit_form(concert, capacity=80, description=""))
+    finally:
+        sa_event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 302
+    assert statements == [
+        "UPDATE events SET capacity=?, version=(events.version + ?), updated_at=CURRENT_TIMESTAMP "
+        "WHERE events.id = ? AND events.version = ?"
+    ]
+    db.session.expire_all()
+    assert (concert.capacity, concert.version) == (80, 2)
+    assert (concert.title, concert.description, concert.wishlist, concert.address_line1) == (
+        "Concert", "Bring earplugs", "Snacks", "2 Hall Rd",
+    )
@@ -0,0 +1,83 @@
+"""Start-up cost of each entry point, measured in a fresh interpreter.
+
+Cold import times are compared with ``import flask`` measured in the same
+run, so the budgets hold on slow and fast machines alike.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed to serve pages; see app/views/__init__.py
+VIEW_ONLY = ("app.views.", "app.forms", "wtforms", "flask_wtf")
+
+# Cumulative -X importtime of an entry point, as a multiple of ``import flask``
+IMPORT_BUDGETS = {"create_app": 4.0, "preload": 4.0, "flask --help": 4.5}
+RUNS = 3  # the fastest run counts
+
+# Dumps sys.modules on exit
+DUMP = "import atexit, sys; out = sys.argv[1]; atexit.register(lambda: open(out, 'w').write('\\n'.join(sys.modules)))\n"
+
+ENTRY_POINTS = {
+    "flask --help": "import sys; sys.argv = ['flask', '--help']; from flask.cli import main; main()",
+    "create_app": "from app import create_app; create_app()",
+    "preload": "from app import create_app, views; create_app(); views.preload()",
+    "import flask": "import flask",
+}
+
+
+def run(*args):
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "FLASK_APP": "app"},
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return result
+
+
+def loaded_modules(tmp_path, entry_point):
+    out = tmp_path / "modules.txt"
+    run("-c", DUMP + ENTRY_POINTS[entry_point], str(out))
+    return set(out.read_text().splitlines())
+
+
+def import_time(entry_point):
+    """Total import time in us: the sum of the cumulative times of top-level imports."""
+    total = 0
+    for line in run("-X", "importtime", "-c", ENTRY_POINTS[entry_point]).stderr.splitlines():
+        if line.startswith("import time:"):
+            _, cumulative, name = line.split("|")
+            # Nested imports are indented under their parent and already counted in it
+            if cumulative.strip().isdigit() and not name.startswith("  "):
+                total += int(cumulative)
+    return total
+
+
+@pytest.mark.parametrize("entry_point", IMPORT_BUDGETS)
+def test_import_time_within_budget(entry_point):
+    baseline = min(import_time("import flask") for _ in range(RUNS))
+    ratio = min(import_time(entry_point) for _ in range(RUNS)) / baseline
+    assert ratio <= IMPORT_BUDGETS[entry_point], (
+        f"{entry_point} imports for {ratio:.1f}x as long as `import flask` "
+        f"(budget {IMPORT_BUDGETS[entry_point]}x); run `python -X importtime` to find the new cost"
+    )
+
+
+@pytest.mark.parametrize("entry_point", ["flask --help", "create_app"])
+def test_startup_does_not_import_views(tmp_path, entry_point):
+    modules = loaded_modules(tmp_path, entry_point)
+    assert sorted(m for m in modules if m.startswith(VIEW_ONLY)) == []
+
+
+def test_create_app_does_not_import_alembic(tmp_path):
+    modules = loaded_modules(tmp_path, "create_app")
+    assert "alembic" not in modules and "flask_migrate" not in modules
+
+
+def test_preload_imports_every_view(tmp_path):
+    modules = loaded_modules(tmp_path, "preload")
+    assert {"app.views.events", "app.views.auth", "app.forms", "wtforms"} <= modules
@@ -0,0 +1,117 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from werkzeug.exceptions import TooManyRequests
+
+from app import db, limiter
+from app.limits import MemoryBackend, WriteGate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("app.limits.time.monotonic", clock)
+    return clock
+
+
+def test_bucket_empties_and_refills(clock):
+    backend = MemoryBackend()
+    rate = 2 / 60  # 2 per minute
+    assert backend.take("k", 2, rate) == 0
+    assert backend.take("k", 2, rate) == 0
+    assert backend.take("k", 2, rate) == pytest.approx(30)
+
+    clock.now += 30
+    assert backend.take("k", 2, rate) == 0
+    assert backend.take("k", 2, rate) == pytest.approx(30)
+
+    clock.now += 600  # refills to the burst, no further
+    assert [backend.take("k", 2, rate) for _ in range(3)][-1] == pytest.approx(30)
+
+
+def test_bucket_evicts_the_oldest_idle_key(clock):
+    backend = MemoryBackend(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        backend.take(key, 1, 1)
+    assert list(backend._buckets) == ["a", "c"]
+
+
+@pytest.fixture
+def limited(make_app):
+    app = make_app(RATELIMIT_ENABLED=True, RATELIMITS={"login": (2, 60), "register": (1, 60)})
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_ip_bucket_answers_429_with_retry_after(limited, clock):
+    client = limited.test_client()
+    for _ in range(2):
+        assert client.post("/login", data={}).status_code != 429
+    response = client.post("/login", data={})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+    other = limited.test_client()
+    assert other.post("/login", data={}, environ_base={"REMOTE_ADDR": "10.0.0.2"}).status_code != 429
+    # GETs are never limited
+    assert client.get("/login").status_code == 200
+
+
+def test_user_bucket_follows_the_user_across_addresses(limited, clock, monkeypatch):
+    alice = SimpleNamespace(is_authenticated=True, id=7)
+    monkeypatch.setattr("flask_login.utils._get_user", lambda: alice)
+    with limited.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        limiter.check("register")
+    with limited.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.2"}):
+        with pytest.raises(TooManyRequests) as exc:
+            limiter.check("register")
+    assert exc.value.retry_after == 60
+
+
+def test_write_gate_turns_writes_away_after_the_timeout():
+    gate = WriteGate(slots=1, timeout=0.05)
+    with gate:
+        waited = []
+
+        def second():
+            try:
+                with gate:
+                    waited.append("ran")
+            except TooManyRequests as e:
+                waited.append(e.code)
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        thread.join()
+    assert waited == [429]
+    with gate:
+        pass  # the slot was released
+
+
+def test_locked_database_maps_to_429(app, client):
+    def locked():
+        raise OperationalError("UPDATE events", {}, Exception("database is locked"))
+
+    def broken():
+        raise OperationalError("SELECT nope", {}, Exception("no such table: nope"))
+
+    app.add_url_rule("/locked", "locked", locked)
+    app.add_url_rule("/broken", "broken", broken)
+    response = client.get("/locked")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+    app.config["PROPAGATE_EXCEPTIONS"] = True
+    with pytest.raises(OperationalError, match="no such table"):
+        client.get("/broken")
@@ -0,0 +1,65 @@
+import json
+import queue
+from datetime import datetime, timedelta
+
+from app import broker, db
+from app.live import RESYNC_FRAME, Broker, format_frame
+from app.models import Event
+
+
+def test_overflowing_subscriber_gets_a_single_resync():
+    live = Broker()
+    live.queue_size = 2
+    q = live.subscribe(1)
+    for n in range(3):
+        live.publish(1, "seats", {"seats_taken": n})
+    assert q.get_nowait() == RESYNC_FRAME
+    assert q.empty()
+
+
+def test_resync_never_raises_when_a_put_races_the_clear(monkeypatch):
+    live = Broker()
+    live.queue_size = 1
+    q = live.subscribe(1)
+    q.put_nowait("backlog")
+
+    # Another writer refills the queue right after this one finds it full
+    def put_nowait(frame):
+        raise queue.Full
+
+    monkeypatch.setattr(q, "put_nowait", put_nowait)
+    live.publish(1, "seats", {"seats_taken": 1})
+    assert list(q.queue) == [RESYNC_FRAME]
+
+
+def test_failed_backend_does_not_raise():
+    live = Broker()
+
+    class Down:
+        def publish(self, event_id, frame):
+            raise ConnectionError("redis is down")
+
+    live.backend = Down()
+    live.publish(1, "seats", {"seats_taken": 1})
+
+
+def test_updated_rating_reuses_its_id(logged_in, user):
+    event = Event(
+        title="Quiz Night",
+        starts_at=datetime.now() + timedelta(days=1),
+        ends_at=datetime.now() + timedelta(days=1, hours=2),
+        organizer_id=user.id,
+    )
+    db.session.add(event)
+    db.session.commit()
+    q = broker.subscribe(event.id)
+    try:
+        for score in (3, 5):
+            logged_in.post(f"/event/{event.id}", data={"score": score, "submit": "Rate"})
+        first, second = (q.get_nowait() for _ in range(2))
+    finally:
+        broker.unsubscribe(event.id, q)
+    payloads = [json.loads(frame.split("data: ", 1)[1]) for frame in (first, second)]
+    assert payloads[0]["id"] == payloads[1]["id"]
+    assert [p["score"] for p in payloads] == [3, 5]
+    assert second == format_frame("rating", payloads[1])
@@ -0,0 +1,65 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from app import db, media
+
+DIGEST = "ab" * 32
+
+
+def test_webp_source_only_once_the_thumbnail_exists(app, logged_in, user):
+    user.avatar_url = f"/media/originals/{DIGEST}.png"
+    db.session.commit()
+
+    page = logged_in.get("/view/alice").get_data(as_text=True)
+    assert "image/webp" not in page
+    assert f"/media/originals/{DIGEST}.png" in page
+
+    name = media.derived_name(DIGEST, "lg", "webp")
+    with open(os.path.join(media.media_dir(), "derived", name), "wb") as f:
+        f.write(b"RIFF")
+    page = logged_in.get("/view/alice").get_data(as_text=True)
+    assert f'type="image/webp" srcset="/media/derived/{name}"' in page
+
+
+def test_no_webp_for_default_or_external_avatars(app, user):
+    with app.test_request_context():
+        assert media.avatar_webp_url(user) is None
+        user.avatar_url = "https://example.com/me.png"
+        assert media.avatar_webp_url(user) is None
+        assert media.avatar_url(user) == "https://example.com/me.png"
+
+
+def test_thumbnail_names_change_with_their_render_settings(monkeypatch):
+    name = media.derived_name(DIGEST, "sm", "jpg")
+    assert name.startswith(f"{DIGEST}-64px-") and name.endswith(".jpg")
+
+    monkeypatch.setitem(media.SIZES, "sm", 96)
+    assert media.derived_name(DIGEST, "sm", "jpg").startswith(f"{DIGEST}-96px-")
+    monkeypatch.setitem(media.SIZES, "sm", 64)
+    monkeypatch.setitem(media.FORMATS, "jpg", ("JPEG", {"quality": 70}))
+    assert media.derived_name(DIGEST, "sm", "jpg") != name
+    monkeypatch.undo()
+    monkeypatch.setattr(media, "RENDER_VERSION", media.RENDER_VERSION + 1)
+    assert media.derived_name(DIGEST, "sm", "jpg") != name
+
+
+def upload(data, filename):
+    return FileStorage(io.BytesIO(data), filename=filename)
+
+
+def test_stored_type_comes_from_the_image_not_the_filename(app, client):
+    png = io.BytesIO()
+    Image.new("RGB", (4, 4), "red").save(png, "PNG")
+    with app.test_request_context():
+        url = media.save_avatar(upload(png.getvalue(), "holiday.jpg"))
+    assert url.endswith(".png")
+    assert client.get(url).mimetype == "image/png"
+
+
+def test_non_images_are_refused(app):
+    with app.test_request_context(), pytest.raises(ValueError):
+        media.save_avatar(upload(b"<svg onload=alert(1)>", "avatar.png"))
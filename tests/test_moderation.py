@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+
+
+@pytest.fixture
+def admin(logged_in, user):
+    user.is_admin = True
+    db.session.commit()
+    return logged_in
+
+
+@pytest.mark.parametrize("body", [
+    {"action": "ban", "usernames": 5},
+    {"action": "ban", "usernames": ["bob", 7]},
+    {"action": "ban", "event_id": "1"},
+    {"action": "ban", "event_id": True},
+    {"action": "ban", "since": 123},
+    {"action": "ban", "until": "yesterday"},
+    {"action": ["ban"], "usernames": ["bob"]},
+    ["ban"],
+])
+def test_api_rejects_wrongly_typed_fields(admin, body):
+    response = admin.post("/admin/moderation/api", json=body)
+    assert response.status_code == 400
+    assert "error" in response.json
+
+
+def test_api_runs_a_valid_request(admin):
+    response = admin.post("/admin/moderation/api", json={"action": "ban", "usernames": "bob, carol"})
+    assert response.status_code == 200
+    assert response.json == {"action": "ban", "affected": 0}
+
+
+def test_api_times_are_compared_in_utc():
+    from app.views.admin import api_criteria
+
+    criteria = api_criteria({"since": "2026-01-01T02:00+02:00", "until": "2026-01-02T00:00"})
+    assert (criteria.since, criteria.until) == (datetime(2026, 1, 1), datetime(2026, 1, 2))
+
+
+def test_console_says_times_are_utc(admin):
+    page = admin.get("/admin/moderation").get_data(as_text=True)
+    assert "From (UTC)" in page and "Until (UTC)" in page
@@ -0,0 +1,14 @@
+"""Every route's queries must use an index (see app/query_audit.py)."""
+import click
+import pytest
+
+from app import query_audit
+
+
+def test_no_route_full_scans_a_large_table(make_app, capsys):
+    app = make_app()
+    with app.app_context():
+        try:
+            query_audit.audit(verbose=False)
+        except click.ClickException as e:
+            pytest.fail(f"{e.message}\n{capsys.readouterr().out}")
@@ -0,0 +1,71 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from app.recurrence import RecurrenceFreq, _candidates, expand, occurrence_on
+
+
+def series(freq, starts_at=datetime(2026, 1, 1, 18), hours=2, interval=1, until=None, count=None, exdates=None):
+    return SimpleNamespace(
+        starts_at=starts_at,
+        ends_at=starts_at + timedelta(hours=hours),
+        recurrence_freq=freq,
+        recurrence_interval=interval,
+        recurrence_until=until,
+        recurrence_count=count,
+        recurrence_exdates=exdates,
+    )
+
+
+def days(event, start=datetime(2025, 1, 1), end=datetime(2028, 1, 1)):
+    return [occ.starts_at.date() for occ in expand(event, start, end)]
+
+
+def test_one_off_event_overlapping_the_window():
+    event = series(None)
+    assert days(event) == [date(2026, 1, 1)]
+    assert days(event, start=datetime(2026, 1, 1, 20)) == []
+
+
+def test_interval():
+    event = series(RecurrenceFreq.weekly, interval=2, count=3)
+    assert days(event) == [date(2026, 1, 1), date(2026, 1, 15), date(2026, 1, 29)]
+
+
+def test_count_and_until_stop_at_whichever_comes_first():
+    assert len(days(series(RecurrenceFreq.daily, count=3, until=datetime(2026, 1, 10)))) == 3
+    assert days(series(RecurrenceFreq.daily, count=30, until=datetime(2026, 1, 2, 23))) == [
+        date(2026, 1, 1), date(2026, 1, 2),
+    ]
+
+
+def test_exdates_are_skipped_but_still_count():
+    event = series(RecurrenceFreq.daily, count=4, exdates="2026-01-02,2026-01-03")
+    assert days(event) == [date(2026, 1, 1), date(2026, 1, 4)]
+
+
+def test_monthly_skips_months_without_the_day():
+    event = series(RecurrenceFreq.monthly, starts_at=datetime(2026, 1, 31, 18), count=4)
+    assert days(event) == [date(2026, 1, 31), date(2026, 3, 31), date(2026, 5, 31), date(2026, 7, 31)]
+
+
+def test_window_clips_and_includes_occurrences_in_progress():
+    event = series(RecurrenceFreq.daily)
+    window = expand(event, datetime(2026, 3, 1, 19), datetime(2026, 3, 3))
+    assert [occ.starts_at for occ in window] == [datetime(2026, 3, 1, 18), datetime(2026, 3, 2, 18)]
+
+
+def test_skips_ahead_instead_of_walking_from_the_start():
+    first_useful = datetime(2036, 1, 1)
+    index, start = next(_candidates(datetime(2026, 1, 1, 18), RecurrenceFreq.daily, 1, first_useful))
+    assert index == (first_useful - datetime(2026, 1, 1, 18)).days
+    assert start <= first_useful < start + timedelta(days=1)
+
+    event = series(RecurrenceFreq.weekly, count=600)
+    assert days(event, datetime(2035, 6, 1), datetime(2035, 6, 15)) == [date(2035, 6, 7), date(2035, 6, 14)]
+
+
+def test_occurrence_on():
+    event = series(RecurrenceFreq.weekly, exdates="2026-01-08")
+    assert occurrence_on(event, date(2026, 1, 15)).starts_at == datetime(2026, 1, 15, 18)
+    assert occurrence_on(event, date(2026, 1, 8)) is None
+    assert occurrence_on(event, date(2026, 1, 9)) is None
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Category, Event
+
+
+def test_category_suggestion_lists_its_events(logged_in, user):
+    jazz = Category(slug="jazz", name="Jazz")
+    db.session.add(Event(
+        title="Friday Night Session",
+        starts_at=datetime.now() + timedelta(days=1),
+        ends_at=datetime.now() + timedelta(days=1, hours=2),
+        organizer_id=user.id,
+        categories=[jazz],
+    ))
+    db.session.commit()
+
+    suggestions = logged_in.get("/search/suggest?q=jaz").json["suggestions"]
+    category = next(s for s in suggestions if s["kind"] == "category")
+    assert category["label"] == "Jazz"
+
+    page = logged_in.get(category["url"]).get_data(as_text=True)
+    assert "Friday Night Session" in page
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Event, Rsvp, RsvpStatus
+from app.suggest import Typeahead
+
+
+@pytest.fixture
+def typeahead(app):
+    typeahead = Typeahead()
+    typeahead.init_app(app)
+    return typeahead
+
+
+def add_event(user, title):
+    event = Event(
+        title=title,
+        starts_at=datetime.now() + timedelta(days=1),
+        ends_at=datetime.now() + timedelta(days=1, hours=2),
+        address_line1="3 Park Ln",
+        organizer_id=user.id,
+    )
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def weights(typeahead, prefix):
+    return {e.label: e.weight for e in typeahead.suggest(prefix) if e.kind == "event"}
+
+
+def test_rsvp_during_a_reload_is_not_counted_twice(typeahead, user):
+    event = add_event(user, "Jazz Night")
+    typeahead.suggest("jazz")
+
+    # An RSVP commits, the reload reads it, and only then does its adjust arrive
+    assert typeahead._begin_load()
+    db.session.add(Rsvp(user=user, event=event, status=RsvpStatus.going, guests_count=0))
+    db.session.commit()
+    index = typeahead.load()
+    typeahead.adjust_rsvps(event.id, 1)
+    typeahead._install(index)
+
+    assert weights(typeahead, "jazz") == {"Jazz Night": 1}
+
+
+def test_event_added_during_a_reload_is_kept(typeahead, user):
+    typeahead.suggest("jazz")
+    assert typeahead._begin_load()
+    index = typeahead.load()
+    typeahead.add_event(add_event(user, "Jazz Brunch"))
+    typeahead._install(index)
+
+    assert weights(typeahead, "jazz") == {"Jazz Brunch": 0}
+
+
+def test_failed_first_load_stops_queueing_updates(typeahead, user, monkeypatch):
+    def broken():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(typeahead, "load", broken)
+    with pytest.raises(RuntimeError):
+        typeahead.suggest("jazz")
+    assert typeahead._pending is None
+
+    typeahead.adjust_rsvps(1, 1)
+    assert typeahead._pending is None
+
+    monkeypatch.undo()
+    add_event(user, "Jazz Night")
+    assert weights(typeahead, "jazz") == {"Jazz Night": 0}